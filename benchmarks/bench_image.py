@@ -0,0 +1,136 @@
+# Measures the peak resident memory an image node adds on top of its input image, with and without tiling, for a
+# range of image sizes. Each measurement runs in a fresh interpreter and reads the peak from /proc, so this only
+# runs on Linux. Before measuring, the tiled output of every image node is checked against the untiled output.
+#
+#   python benchmarks/bench_image.py --sizes 1024 4096 8192
+
+from pathlib import Path
+
+import argparse
+import json
+import subprocess
+import sys
+import types
+
+import numpy as np
+
+from PIL import Image
+
+import pack
+
+_SNIPPET = """
+import json, sys, time, types
+sys.path.insert(0, {benchmarks!r})
+import pack
+from PIL import Image
+
+pack.load("essentials")
+essentials_image = pack.load("essentials_image")
+essentials_image._TILE_PIXELS = {tile_pixels}
+
+def resident(field):
+    with open("/proc/self/status") as file:
+        return next(int(line.split()[1]) * 1024 for line in file if line.startswith(field))
+
+noise = Image.effect_noise(({size}, {size}), 64)
+image = Image.merge("RGB", (noise, noise, noise))
+del noise
+
+images = types.SimpleNamespace(
+    get_pil_image=lambda name: image,
+    create=lambda image, **kwargs: types.SimpleNamespace(image_name="output", width=image.width, height=image.height),
+)
+context = types.SimpleNamespace(services=types.SimpleNamespace(images=images), graph_execution_state_id="benchmark")
+invocation = essentials_image.ImageLevelsInvocation(image=essentials_image.ImageField(image_name="input"), gamma=1.2)
+
+# Resets the peak resident memory so it only covers the invoke
+with open("/proc/self/clear_refs", "w") as file:
+    file.write("5")
+
+before = resident("VmRSS:")
+start = time.perf_counter()
+invocation.invoke(context)
+seconds = time.perf_counter() - start
+
+print(json.dumps({{"seconds": seconds, "peak_bytes": resident("VmHWM:") - before, "image_bytes": image.width * image.height * 3}}))
+"""
+
+
+def verify(size: int, tile_size: int) -> list:
+    """Runs every image node on a random image with and without tiling and returns the nodes whose outputs differ"""
+
+    essentials = pack.load("essentials")
+    essentials_image = pack.load("essentials_image")
+    rng = np.random.default_rng(0)
+    inputs = {
+        "a": Image.fromarray(rng.integers(0, 256, (size, size + 7, 4), dtype=np.uint8)),
+        "b": Image.fromarray(rng.integers(0, 256, (size, size + 7, 3), dtype=np.uint8)),
+    }
+    outputs = {}
+
+    def create(image, **kwargs):
+        outputs[len(outputs)] = np.array(image)
+        return types.SimpleNamespace(image_name=str(len(outputs) - 1), width=image.width, height=image.height)
+
+    images = types.SimpleNamespace(get_pil_image=inputs.__getitem__, create=create)
+    context = essentials.InvocationContext(services=types.SimpleNamespace(images=images))
+    invocations = [
+        essentials_image.ImageAddInvocation(image={"image_name": "a"}, value=-40),
+        essentials_image.ImageMultiplyInvocation(image={"image_name": "b"}, value=1.7),
+        essentials_image.ImageBlendInvocation(image_a={"image_name": "a"}, image_b={"image_name": "b"}, alpha=0.3),
+        essentials_image.ImageClampInvocation(image={"image_name": "b"}, low=30, high=200),
+        essentials_image.ImageLevelsInvocation(image={"image_name": "a"}, in_low=20, in_high=220, gamma=0.8, out_low=10),
+        essentials_image.ImageThresholdInvocation(image={"image_name": "b"}, threshold=99),
+    ]
+    differing = []
+    tile_pixels, default_tile_size = essentials_image._TILE_PIXELS, essentials_image._TILE_SIZE
+
+    try:
+        for invocation in invocations:
+            essentials_image._TILE_PIXELS = size * size * 2
+            invocation.invoke(context)
+            essentials_image._TILE_PIXELS, essentials_image._TILE_SIZE = 0, tile_size
+            invocation.invoke(context)
+            essentials_image._TILE_SIZE = default_tile_size
+
+            if not np.array_equal(outputs[len(outputs) - 2], outputs[len(outputs) - 1]):
+                differing.append(type(invocation).__name__)
+    finally:
+        essentials_image._TILE_PIXELS, essentials_image._TILE_SIZE = tile_pixels, default_tile_size
+
+    return differing
+
+
+def measure(size: int, tiled: bool) -> dict:
+    snippet = _SNIPPET.format(benchmarks=str(Path(__file__).resolve().parent), size=size, tile_pixels=0 if tiled else size * size)
+    process = subprocess.run([sys.executable, "-c", snippet], capture_output=True, text=True, check=True)
+
+    return json.loads(process.stdout)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measures the peak memory of the image nodes with and without tiling")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 2048, 4096, 8192], help="Widths of the square RGB test images")
+    args = parser.parse_args()
+
+    differing = verify(300, 128)
+
+    if differing:
+        print(f"tiled output differs from the untiled output for {', '.join(differing)}")
+        return 1
+
+    print("tiled output is identical to the untiled output for every image node\n")
+    print(f"{'size':>8}{'image MB':>12}{'untiled MB':>14}{'tiled MB':>12}{'untiled ms':>14}{'tiled ms':>12}")
+
+    for size in args.sizes:
+        untiled, tiled = measure(size, False), measure(size, True)
+        print(
+            f"{size:>8}{untiled['image_bytes'] / 1e6:>12.1f}{untiled['peak_bytes'] / 1e6:>14.1f}{tiled['peak_bytes'] / 1e6:>12.1f}"
+            f"{untiled['seconds'] * 1000:>14.1f}{tiled['seconds'] * 1000:>12.1f}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# Measures how long a fresh interpreter takes to load the modules of the node pack and which imports that triggers, in the
+# style of python -X importtime. InvokeAI, pydantic and the stubs are imported before the measurement starts as
+# they are already loaded by the time InvokeAI imports the pack.
+#
+#   python benchmarks/bench_import.py --runs 10
+
+from pathlib import Path
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+_SNIPPET = """
+import json, sys, time
+sys.path.insert(0, {benchmarks!r})
+import pack
+import pydantic
+import invokeai.app.invocations.baseinvocation
+import invokeai.app.invocations.primitives
+print("--- pack ---", file=sys.stderr, flush=True)
+start = time.perf_counter()
+for name in {modules!r}:
+    pack.load(name)
+seconds = time.perf_counter() - start
+deferred = [name for name in {deferred!r} if name not in sys.modules]
+print("--- numpy ---", file=sys.stderr, flush=True)
+start = time.perf_counter()
+import numpy
+numpy_seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "numpy_seconds": numpy_seconds, "deferred": deferred}}))
+"""
+
+# InvokeAI imports every module in its invocations folder, so all modules of the pack are loaded
+_MODULES = ("essentials", "essentials_image", "essentials_fusion", "essentials_analysis")
+
+# Modules the pack should only import once a node that needs them runs
+_DEFERRED = ("numpy", "PIL.Image", "random")
+
+
+def _imports(stderr: str, section: str) -> list:
+    """Parses the top level entries of a -X importtime section as (cumulative microseconds, module)"""
+
+    lines = stderr.split(f"--- {section} ---", 1)[1].split("--- ", 1)[0].splitlines()
+    imports = []
+
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        _, cumulative, name = line[len("import time:"):].split("|")
+
+        # Nested imports are indented below the module that triggered them
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            imports.append((int(cumulative), name.strip()))
+
+    return imports
+
+
+def run(runs: int) -> dict:
+    snippet = _SNIPPET.format(benchmarks=str(Path(__file__).resolve().parent), modules=_MODULES, deferred=_DEFERRED)
+    seconds = []
+    numpy_seconds = []
+    imports = []
+    deferred = []
+
+    for _ in range(runs):
+        process = subprocess.run([sys.executable, "-X", "importtime", "-c", snippet], capture_output=True, text=True, check=True)
+        result = json.loads(process.stdout)
+        seconds.append(result["seconds"])
+        numpy_seconds.append(result["numpy_seconds"])
+        imports = _imports(process.stderr, "pack")
+        deferred = result["deferred"]
+
+    return {
+        "seconds": statistics.median(seconds),
+        "numpy_seconds": statistics.median(numpy_seconds),
+        "imports": sorted(imports, reverse=True),
+        "deferred": deferred,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measures the import time of the node pack")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to median over")
+    args = parser.parse_args()
+
+    result = run(args.runs)
+
+    print(f"pack import:                {result['seconds'] * 1000:8.1f} ms")
+    print(f"numpy import saved per run: {result['numpy_seconds'] * 1000:8.1f} ms (0 if loaded by the pack)")
+    print(f"not imported by the pack:   {', '.join(result['deferred']) or 'none'}")
+    print("\nimports triggered by the pack (cumulative us):")
+
+    for cumulative, name in result["imports"][:15]:
+        print(f"{cumulative:>10}  {name}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+# Microbenchmarks of the per node overhead of the pack: pydantic construction, validation and invoke.
+#
+# Runs against the InvokeAI stubs in ./stubs and only requires numpy and pydantic<2:
+#
+#   python benchmarks/bench_invocations.py --output baseline.json
+#   python benchmarks/bench_invocations.py --compare baseline.json
+
+from typing import Optional, get_args, get_origin, get_type_hints
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pydantic
+
+import pack
+
+essentials = pack.load("essentials")
+fusion = pack.load("essentials_fusion")
+
+# Inputs that would otherwise fall outside the domain of an operation
+_OVERRIDES = {
+    "floatacosh": {"a": 1.5},
+}
+
+_SCALAR_INPUTS = {int: 3, float: 0.5, bool: True}
+
+# Calls whose outputs are kept alive to count the blocks allocated per call
+_ALLOCATION_CALLS = 100
+
+_CHAINS = {
+    # Width from a base size, scale factor and padding snapped to a multiple of 8
+    "dimension": [
+        ("scale", "floatmul", {"a": 512.0, "b": 1.5}, {}),
+        ("pad", "floatadd", {"b": 12.0}, {"a": "scale"}),
+        ("snap", "floatroundtomultiple", {"n": 8.0}, {"a": "pad"}),
+        ("fits", "intlessequals", {"b": 1024}, {"a": "snap"}),
+    ],
+    # A cosine strength curve value for a step
+    "curve": [
+        ("step", "inttofloat", {"a": 7}, {}),
+        ("progress", "floatdiv", {"b": 30.0}, {"a": "step"}),
+        ("angle", "floatmul", {"b": 3.141592653589793}, {"a": "progress"}),
+        ("cos", "floatcos", {}, {"a": "angle"}),
+        ("scaled", "floatmul", {"b": 0.5}, {"a": "cos"}),
+        ("strength", "floatadd", {"b": 0.5}, {"a": "scaled"}),
+    ],
+    # Halvings and doublings of a value computed by a node that is not fused, each doubling consuming its halving
+    # twice, which would repeat the whole chain up to it in its formula if inlined
+    "diamond": [
+        ("double", "intadd", {"a": 1, "b": 2}, {}),
+        *(
+            node
+            for i in range(16)
+            for node in (
+                (f"half{i}", "floatmul", {"b": 0.5}, {"a": f"double{i - 1}" if i else "double"}),
+                (f"double{i}", "floatadd", {}, {"a": f"half{i}", "b": f"half{i}"}),
+            )
+        ),
+    ],
+}
+
+
+def sample_inputs(invocation_type: str, cls: type, size: int) -> dict:
+    """Builds valid inputs for an invocation, with collections of the given size"""
+
+    inputs = {}
+
+    for name, annotation in get_type_hints(cls).items():
+        if name not in cls.__fields__ or name in ("id", "is_intermediate", "type"):
+            continue
+
+        if get_origin(annotation) is list:
+            inputs[name] = [_SCALAR_INPUTS[get_args(annotation)[0]]] * size
+        elif annotation is essentials.PackedCollection:
+            inputs[name] = essentials.PackedCollection.from_array(np.full(size, _SCALAR_INPUTS[float]))
+        elif name in ("a", "b", "c", "d", "n"):
+            inputs[name] = _SCALAR_INPUTS[annotation]
+        elif name == "size":
+            inputs[name] = size
+
+    inputs.update(_OVERRIDES.get(invocation_type, {}))
+
+    return inputs
+
+
+def allocations(cls: type, inputs: dict, context) -> tuple:
+    """Returns the memory blocks and bytes allocated per construction and invoke that are still held by the output
+
+    Temporaries freed before a call returns do not show up in the difference of the snapshots, they only add to
+    the peak memory of a call.
+    """
+
+    outputs = [None] * _ALLOCATION_CALLS
+    ignored = (tracemalloc.Filter(False, tracemalloc.__file__),)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot().filter_traces(ignored)
+
+    for index in range(_ALLOCATION_CALLS):
+        outputs[index] = cls(**inputs).invoke(context)
+
+    after = tracemalloc.take_snapshot().filter_traces(ignored)
+    tracemalloc.stop()
+
+    differences = after.compare_to(before, "filename")
+    blocks = sum(difference.count_diff for difference in differences)
+    size = sum(difference.size_diff for difference in differences)
+
+    return blocks / _ALLOCATION_CALLS, size / _ALLOCATION_CALLS
+
+
+def measure(cls: type, inputs: dict, iterations: int) -> dict:
+    """Times construction and invoke of an invocation and records the allocations and peak memory of a call"""
+
+    context = essentials.InvocationContext()
+
+    try:
+        invocation = cls(**inputs)
+        invocation.invoke(context)
+    except Exception as error:
+        return {"error": f"{type(error).__name__}: {error}"}
+
+    start = time.perf_counter()
+
+    for _ in range(iterations):
+        cls(**inputs)
+
+    construct = (time.perf_counter() - start) / iterations
+    start = time.perf_counter()
+
+    for _ in range(iterations):
+        invocation.invoke(context)
+
+    invoke = (time.perf_counter() - start) / iterations
+
+    blocks, size = allocations(cls, inputs, context)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    cls(**inputs).invoke(context)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "construct_us": construct * 1e6,
+        "invoke_us": invoke * 1e6,
+        "ops_per_second": 1 / (construct + invoke),
+        "allocated_blocks": blocks,
+        "allocated_bytes": size,
+        "peak_bytes": peak,
+    }
+
+
+def chain_graph(chain: list) -> dict:
+    nodes = {}
+    edges = []
+
+    for node_id, invocation_type, fields, connections in chain:
+        nodes[node_id] = {"id": node_id, "type": invocation_type, **fields}
+
+        for field, source in connections.items():
+            edges.append({"source": {"node_id": source, "field": "value"}, "destination": {"node_id": node_id, "field": field}})
+
+    return {"nodes": nodes, "edges": edges}
+
+
+def collection_counterpart(invocation_type: str) -> Optional[str]:
+    for prefix in ("int", "float", "bool"):
+        if invocation_type.startswith(prefix) and not invocation_type.startswith(f"{prefix}collection"):
+            return f"{prefix}collection{invocation_type[len(prefix):]}"
+
+    return None
+
+
+def run(iterations: int, size: int) -> dict:
+    essentials.invocation_cache.configure(0)
+
+    results = {}
+
+    for invocation_type, cls in sorted(pack.invocations(essentials).items()):
+        results[invocation_type] = measure(cls, sample_inputs(invocation_type, cls, size), iterations)
+
+    # A scalar node has to be dispatched once per element to match one call of its collection counterpart
+    comparisons = {}
+
+    for invocation_type, result in results.items():
+        counterpart = collection_counterpart(invocation_type)
+
+        if counterpart in results and "error" not in result and "error" not in results[counterpart]:
+            comparisons[invocation_type] = {
+                "collection": counterpart,
+                "scalar_us": size * 1e6 / result["ops_per_second"],
+                "collection_us": 1e6 / results[counterpart]["ops_per_second"],
+            }
+
+    chains = {}
+
+    for name, chain in _CHAINS.items():
+        _, report = fusion.fuse_graph(chain_graph(chain), measure=True, iterations=iterations)
+        chains[name] = {
+            "nodes": report.nodes_before,
+            "fused_nodes": report.nodes_after,
+            "us": report.seconds_before * 1e6,
+            "fused_us": report.seconds_after * 1e6,
+        }
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pydantic": pydantic.VERSION,
+        "iterations": iterations,
+        "collection_size": size,
+        "invocations": results,
+        "comparisons": comparisons,
+        "chains": chains,
+    }
+
+
+def report(results: dict, baseline: Optional[dict], threshold: float) -> int:
+    """Prints the results, comparing them against a baseline if given, and returns the number of regressions"""
+
+    regressions = 0
+
+    print(f"{'invocation':<28}{'construct us':>14}{'invoke us':>12}{'ops/s':>12}{'blocks/call':>13}{'bytes/call':>12}{'peak bytes':>12}{'change':>10}")
+
+    for invocation_type, result in results["invocations"].items():
+        if "error" in result:
+            print(f"{invocation_type:<28}  {result['error']}")
+            continue
+
+        change = ""
+        previous = (baseline or {}).get("invocations", {}).get(invocation_type, {})
+
+        if "ops_per_second" in previous:
+            delta = result["ops_per_second"] / previous["ops_per_second"] - 1
+            change = f"{delta:+.1%}"
+
+            if delta < -threshold:
+                change += " !"
+                regressions += 1
+
+        print(f"{invocation_type:<28}{result['construct_us']:>14.2f}{result['invoke_us']:>12.2f}{result['ops_per_second']:>12.0f}{result['allocated_blocks']:>13.1f}{result['allocated_bytes']:>12.0f}{result['peak_bytes']:>12}{change:>10}")
+
+    print(f"\n{'scalar vs collection':<28}{'scalar x' + str(results['collection_size']) + ' us':>20}{'collection us':>16}{'speedup':>10}")
+
+    for invocation_type, comparison in results["comparisons"].items():
+        speedup = comparison["scalar_us"] / comparison["collection_us"]
+        print(f"{invocation_type:<28}{comparison['scalar_us']:>20.1f}{comparison['collection_us']:>16.1f}{speedup:>9.1f}x")
+
+    print(f"\n{'chain':<28}{'nodes':>8}{'us':>10}{'fused nodes':>14}{'fused us':>10}")
+
+    for name, chain in results["chains"].items():
+        print(f"{name:<28}{chain['nodes']:>8}{chain['us']:>10.1f}{chain['fused_nodes']:>14}{chain['fused_us']:>10.1f}")
+
+    if baseline is not None:
+        print(f"\n{regressions} invocations regressed by more than {threshold:.0%}")
+
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the per node overhead of the pack")
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls per measurement")
+    parser.add_argument("--size", type=int, default=64, help="Size of the collection inputs")
+    parser.add_argument("--output", help="Write the results as a JSON baseline to this path")
+    parser.add_argument("--compare", help="Compare against a JSON baseline written by --output")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative ops/s drop reported as a regression")
+    args = parser.parse_args()
+
+    results = run(args.iterations, args.size)
+    baseline = None
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+
+    regressions = report(results, baseline, args.threshold)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
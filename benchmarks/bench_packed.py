@@ -0,0 +1,78 @@
+# Compares list collections against packed collections by the size of their JSON and the time to serialize them,
+# parse them back the way InvokeAI loads the session state between nodes and convert them to an array for the next
+# node. The float collections are random weights, which need most of the 17 significant digits of a float.
+#
+#   python benchmarks/bench_packed.py --sizes 1000 100000 1000000
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import pack
+
+essentials = pack.load("essentials")
+
+
+def best(function, repeats: int) -> tuple:
+    """Returns the fastest time of a function over a number of runs and its result"""
+
+    seconds = float("inf")
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        seconds = min(seconds, time.perf_counter() - start)
+
+    return seconds, result
+
+
+def outputs(size: int) -> dict:
+    """The list and packed outputs of the same random float and integer values"""
+
+    generator = np.random.default_rng(0)
+    floats = generator.random(size)
+    integers = generator.integers(-(1 << 20), 1 << 20, size)
+
+    return {
+        "float list": essentials.FloatCollectionOutput(collection=floats.tolist()),
+        "float64 packed": essentials.PackedCollectionOutput(collection=essentials.PackedCollection.from_array(floats, "float64")),
+        "float32 packed": essentials.PackedCollectionOutput(collection=essentials.PackedCollection.from_array(floats, "float32")),
+        "integer list": essentials.IntegerCollectionOutput(collection=integers.tolist()),
+        "int32 packed": essentials.PackedCollectionOutput(collection=essentials.PackedCollection.from_array(integers, "int32")),
+    }
+
+
+def to_array(output) -> "np.ndarray":
+    collection = output.collection
+
+    return collection.array() if isinstance(collection, essentials.PackedCollection) else np.asarray(collection)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compares list and packed collections by serialized size and time")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000], help="Elements per collection")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs to take the best time of")
+    args = parser.parse_args()
+
+    print(f"{'size':>9}  {'collection':<16}{'json bytes':>12}{'serialize ms':>14}{'parse ms':>10}{'to array ms':>13}{'total ms':>10}")
+
+    for size in args.sizes:
+        for name, output in outputs(size).items():
+            serialize, serialized = best(output.json, args.repeats)
+            parse, parsed = best(lambda: type(output).parse_raw(serialized), args.repeats)
+            convert, array = best(lambda: to_array(parsed), args.repeats)
+
+            # Packing float32 rounds the values, everything else has to survive the round trip exactly
+            if name != "float32 packed" and not np.array_equal(array, to_array(output)):
+                raise AssertionError(f"{name} changed in the round trip")
+
+            total = serialize + parse + convert
+            print(f"{size:>9}  {name:<16}{len(serialized):>12}{serialize * 1000:>14.2f}{parse * 1000:>10.2f}{convert * 1000:>13.2f}{total * 1000:>10.2f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
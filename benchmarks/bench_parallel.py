@@ -0,0 +1,84 @@
+# Measures how the collection nodes scale with the number of processes of the collection pool, timing both the
+# chunked computation alone and a whole invoke, which also converts the collections from and to lists in the
+# invoking process. Speedups are relative to one process, which computes everything in the invoking process.
+#
+#   python benchmarks/bench_parallel.py --processes 1 2 4 8 --size 2000000
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+import pack
+
+essentials = pack.load("essentials")
+
+_EXPRESSION = "atan(a) * log(b, 3) + sqrt(a * a + b * b)"
+
+
+def best(function, repeats: int) -> float:
+    seconds = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+
+    return min(seconds)
+
+
+def run(processes: list, size: int, repeats: int) -> list:
+    rng = np.random.default_rng(0)
+    a, b = rng.uniform(1, 100, size), rng.uniform(1, 100, size)
+    invocation = essentials.FloatCollectionExpressionInvocation(expression=_EXPRESSION, a=a.tolist(), b=b.tolist())
+    function = essentials.partial(essentials._evaluate_collection_expression, _EXPRESSION, ("a", "b"))
+    context = essentials.InvocationContext()
+    expected = function(a, b)
+    results = []
+
+    essentials.invocation_cache.configure(0)
+
+    try:
+        for count in processes:
+            essentials.collection_pool.configure(count, threshold=0)
+
+            # Starts the workers before timing
+            if not np.allclose(essentials.collection_pool.map(function, (a, b), np.float64), expected):
+                raise AssertionError(f"{count} processes computed a different result")
+
+            results.append({
+                "processes": count,
+                "map_seconds": best(lambda: essentials.collection_pool.map(function, (a, b), np.float64), repeats),
+                "invoke_seconds": best(lambda: invocation.invoke(context), repeats),
+            })
+    finally:
+        essentials.collection_pool.shutdown()
+
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measures the scaling of the collection pool with its number of processes")
+    parser.add_argument("--processes", type=int, nargs="+", default=list(range(1, (os.cpu_count() or 1) + 1)), help="Pool sizes to measure")
+    parser.add_argument("--size", type=int, default=2_000_000, help="Size of the collection inputs")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs to take the best time of")
+    args = parser.parse_args()
+
+    results = run(args.processes, args.size, args.repeats)
+
+    print(f"{os.cpu_count()} cores, {args.size} elements, {_EXPRESSION}\n")
+    print(f"{'processes':>10}{'map ms':>10}{'speedup':>10}{'invoke ms':>12}{'speedup':>10}")
+
+    for result in results:
+        print(
+            f"{result['processes']:>10}{result['map_seconds'] * 1000:>10.1f}{results[0]['map_seconds'] / result['map_seconds']:>9.2f}x"
+            f"{result['invoke_seconds'] * 1000:>12.1f}{results[0]['invoke_seconds'] / result['invoke_seconds']:>9.2f}x"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
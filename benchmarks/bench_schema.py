@@ -0,0 +1,96 @@
+# Measures what the invocation classes of the node pack cost at server start: the time to create the classes on
+# import, the time to build their JSON schemas as InvokeAI does for its OpenAPI schema, and the resident and traced
+# memory they add. Each measurement runs in a fresh interpreter.
+#
+#   python benchmarks/bench_schema.py
+#   git show HEAD~1:essentials.py > /tmp/essentials.py && python benchmarks/bench_schema.py --module /tmp/essentials.py
+
+from pathlib import Path
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+_SNIPPET = """
+import json, sys, time, tracemalloc
+sys.path.insert(0, {benchmarks!r})
+import pack
+import pydantic
+import invokeai.app.invocations.baseinvocation
+import invokeai.app.invocations.primitives
+
+def resident():
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[1]) * {page_size}
+
+if {traced}:
+    tracemalloc.start()
+
+memory = resident()
+start = time.perf_counter()
+module = pack.load("essentials", {module!r})
+created = time.perf_counter()
+invocations = pack.invocations(module)
+
+for cls in invocations.values():
+    cls.schema()
+
+built = time.perf_counter()
+
+print(json.dumps({{
+    "invocations": len(invocations),
+    "import_seconds": created - start,
+    "schema_seconds": built - created,
+    "resident_bytes": resident() - memory,
+    "traced_bytes": tracemalloc.get_traced_memory()[0] if {traced} else None,
+}}))
+"""
+
+
+def measure(module: str, traced: bool) -> dict:
+    import resource
+
+    snippet = _SNIPPET.format(
+        benchmarks=str(Path(__file__).resolve().parent),
+        page_size=resource.getpagesize(),
+        traced=traced,
+        module=module,
+    )
+    process = subprocess.run([sys.executable, "-c", snippet], capture_output=True, text=True, check=True)
+
+    return json.loads(process.stdout)
+
+
+def run(module: str, runs: int) -> dict:
+    results = [measure(module, traced=False) for _ in range(runs)]
+
+    return {
+        "invocations": results[0]["invocations"],
+        "import_seconds": statistics.median(result["import_seconds"] for result in results),
+        "schema_seconds": statistics.median(result["schema_seconds"] for result in results),
+        "resident_bytes": statistics.median(result["resident_bytes"] for result in results),
+        "traced_bytes": measure(module, traced=True)["traced_bytes"],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measures class creation, schema build time and memory of the node pack")
+    parser.add_argument("--module", help="Path of an essentials.py revision to measure instead of the working tree")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to median over")
+    args = parser.parse_args()
+
+    result = run(str(Path(args.module).resolve()) if args.module else None, args.runs)
+
+    print(f"invocations:        {result['invocations']:>8}")
+    print(f"class creation:     {result['import_seconds'] * 1000:>8.1f} ms")
+    print(f"schema build:       {result['schema_seconds'] * 1000:>8.1f} ms")
+    print(f"resident memory:    {result['resident_bytes'] / 1024:>8.0f} KiB")
+    print(f"traced allocations: {result['traced_bytes'] / 1024:>8.0f} KiB")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
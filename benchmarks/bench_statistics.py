@@ -0,0 +1,113 @@
+# Compares the exact image statistic nodes against their strided sampling by time and error on synthetic photos:
+# blurred noise over a gradient with a few hard edges, at several sizes. Each error is printed next to the bound
+# documented by the node: levels for the mean, percentage points of the rank for the percentile and the absolute
+# difference of variances for the sharpness. The bounds of the sampled statistics hold with 95% probability.
+#
+#   python benchmarks/bench_statistics.py --sizes 2048 4096 --strides 1 4 16
+
+import argparse
+import math
+import sys
+import time
+import types
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+import pack
+
+essentials = pack.load("essentials")
+essentials_image = pack.load("essentials_image")
+
+
+def photo(size: int) -> Image.Image:
+    """A stand-in for a photo with smooth areas, texture and hard edges"""
+
+    channels = []
+
+    for sigma, radius in ((48, 2), (64, 1), (32, 3)):
+        texture = Image.effect_noise((size, size), sigma).filter(ImageFilter.GaussianBlur(radius))
+        gradient = Image.linear_gradient("L").resize((size, size))
+        channels.append(Image.blend(texture, gradient, 0.5))
+
+    image = Image.merge("RGB", channels)
+    draw = ImageDraw.Draw(image)
+
+    for index in range(8):
+        offset = size * index // 8
+        draw.rectangle((offset, offset, offset + size // 10, offset + size // 12), fill=(240, 220 - index * 20, 30))
+
+    return image
+
+
+def bound(name: str, size: int, stride: int) -> float:
+    """The error bound the node documents for a stride, 0 for the exact statistics"""
+
+    if stride == 1:
+        return 0.0
+
+    if name == "mean luminance":
+        return 1.5
+
+    samples = max(1, size * size // stride**2) if name == "5th percentile" else max(2, (size - 2) ** 2 // stride**2)
+    root = math.sqrt(math.log(2 / 0.05) / (2 * (samples if name == "5th percentile" else samples // 2)))
+
+    return 100 * root if name == "5th percentile" else 2040**2 / 2 * root
+
+
+def rank_error(histogram: "np.ndarray", percentile: float, value: float) -> float:
+    """How many percentage points a percentile lies outside the ranks of the pixels at the output level"""
+
+    shares = 100 * np.cumsum(histogram) / histogram.sum()
+    below = shares[int(value) - 1] if value >= 1 else 0.0
+
+    return max(0.0, below - percentile, percentile - shares[int(value)])
+
+
+def best(function, repeats: int) -> tuple:
+    seconds = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        value = function()
+        seconds.append(time.perf_counter() - start)
+
+    return min(seconds), value
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compares exact and sampled image statistics by time and error")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 4096], help="Widths of the square test images")
+    parser.add_argument("--strides", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="Strides to compare, 1 is exact")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs to take the best time of")
+    args = parser.parse_args()
+
+    invocations = {
+        "mean luminance": lambda stride: essentials_image.ImageLuminanceInvocation(image={"image_name": "photo"}, stride=stride),
+        "5th percentile": lambda stride: essentials_image.ImageLuminancePercentileInvocation(image={"image_name": "photo"}, percentile=5, stride=stride),
+        "sharpness": lambda stride: essentials_image.ImageSharpnessInvocation(image={"image_name": "photo"}, stride=stride),
+    }
+
+    print(f"{'size':>6}  {'statistic':<16}{'stride':>7}{'ms':>9}{'value':>11}{'error':>10}{'bound':>10}")
+
+    for size in args.sizes:
+        image = photo(size)
+        context = essentials.InvocationContext(services=types.SimpleNamespace(images=types.SimpleNamespace(get_pil_image=lambda name: image)))
+        histogram = essentials_image._luminance_histogram(context, essentials_image.ImageField(image_name="photo"), 1)
+
+        for name, create in invocations.items():
+            exact = None
+
+            for stride in [1] + [stride for stride in args.strides if stride != 1]:
+                seconds, output = best(lambda: create(stride).invoke(context), args.repeats)
+                exact = output.value if exact is None else exact
+
+                error = rank_error(histogram, 5, output.value) if name == "5th percentile" else abs(output.value - exact)
+
+                print(f"{size:>6}  {name:<16}{stride:>7}{seconds * 1000:>9.1f}{output.value:>11.2f}{error:>10.2f}{bound(name, size, stride):>10.2f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+# Measures the per node overhead saved by the trusted paths for already typed inputs: construct_trusted against the
+# validating constructor, and trusted against validated assignment of upstream outputs to the inputs of a node.
+#
+#   python benchmarks/bench_trusted.py --iterations 5000 --size 64
+
+import argparse
+import sys
+import time
+
+import pydantic
+
+import pack
+
+from bench_invocations import sample_inputs
+
+essentials = pack.load("essentials")
+
+
+def per_call(function, iterations: int) -> float:
+    start = time.perf_counter()
+
+    for _ in range(iterations):
+        function()
+
+    return (time.perf_counter() - start) / iterations
+
+
+def assign(node, inputs: dict, setattr_) -> None:
+    for name, value in inputs.items():
+        setattr_(node, name, value)
+
+
+def measure(cls: type, inputs: dict, iterations: int) -> dict:
+    node = cls(**inputs)
+
+    # The same values have to come out of both paths
+    if essentials.construct_trusted(cls, **inputs).dict() != node.dict():
+        raise AssertionError(f"{cls.__name__} constructed differently from trusted inputs")
+
+    return {
+        "trusted_fields": sum(name in cls._trusted_checks for name in inputs),
+        "fields": len(inputs),
+        "construct_us": per_call(lambda: cls(**inputs), iterations) * 1e6,
+        "construct_trusted_us": per_call(lambda: essentials.construct_trusted(cls, **inputs), iterations) * 1e6,
+        "assign_us": per_call(lambda: assign(node, inputs, pydantic.BaseModel.__setattr__), iterations) * 1e6,
+        "assign_trusted_us": per_call(lambda: assign(node, inputs, setattr), iterations) * 1e6,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measures the overhead saved by the trusted construction and assignment of typed inputs")
+    parser.add_argument("--iterations", type=int, default=5000, help="Calls per measurement")
+    parser.add_argument("--size", type=int, default=64, help="Size of the collection inputs")
+    args = parser.parse_args()
+
+    print(f"{'invocation':<28}{'trusted':>9}{'construct us':>14}{'trusted us':>12}{'saved':>8}{'assign us':>11}{'trusted us':>12}{'saved':>8}")
+    saved = []
+
+    for invocation_type, cls in sorted(pack.invocations(essentials).items()):
+        inputs = sample_inputs(invocation_type, cls, args.size)
+
+        if not inputs:
+            continue
+
+        result = measure(cls, inputs, args.iterations)
+        construct_saved = 1 - result["construct_trusted_us"] / result["construct_us"]
+        assign_saved = 1 - result["assign_trusted_us"] / result["assign_us"]
+        saved.append((result["construct_us"] - result["construct_trusted_us"], result["assign_us"] - result["assign_trusted_us"]))
+
+        print(
+            f"{invocation_type:<28}{str(result['trusted_fields']) + '/' + str(result['fields']):>9}"
+            f"{result['construct_us']:>14.2f}{result['construct_trusted_us']:>12.2f}{construct_saved:>8.0%}"
+            f"{result['assign_us']:>11.2f}{result['assign_trusted_us']:>12.2f}{assign_saved:>8.0%}"
+        )
+
+    print(f"\nmean saved per node: {sum(construct for construct, _ in saved) / len(saved):.2f} us constructing, {sum(assign for _, assign in saved) / len(saved):.2f} us assigning")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
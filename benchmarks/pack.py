@@ -0,0 +1,47 @@
+# Loads the node pack modules against the InvokeAI stubs in ./stubs so benchmarks run without an InvokeAI install.
+
+from pathlib import Path
+from types import ModuleType
+from typing import Optional
+
+import importlib.util
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+STUBS = Path(__file__).resolve().parent / "stubs"
+
+PACKAGE = "invokeai.app.invocations"
+
+if str(STUBS) not in sys.path:
+    sys.path.insert(0, str(STUBS))
+
+
+def load(name: str, path: Optional[Path] = None) -> ModuleType:
+    """Imports a module of the pack as if it had been placed in the InvokeAI invocations folder
+
+    A different revision of the module can be loaded under the same name by passing its path.
+    """
+
+    qualified = f"{PACKAGE}.{name}"
+
+    if qualified in sys.modules:
+        return sys.modules[qualified]
+
+    spec = importlib.util.spec_from_file_location(qualified, path or ROOT / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[qualified] = module
+    spec.loader.exec_module(module)
+
+    return module
+
+
+def invocations(module: ModuleType) -> dict:
+    """Maps the invocation type of every invocation class defined in a module to the class"""
+
+    base = sys.modules[f"{PACKAGE}.baseinvocation"].BaseInvocation
+
+    return {
+        value.__fields__["type"].default: value
+        for value in vars(module).values()
+        if isinstance(value, type) and issubclass(value, base) and value is not base and value.__module__ == module.__name__
+    }
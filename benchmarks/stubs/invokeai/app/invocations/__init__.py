@@ -0,0 +1,4 @@
+from pathlib import Path
+
+# Makes the pack importable as invokeai.app.invocations.essentials by name, as the collection pool workers import it
+__path__.append(str(Path(__file__).resolve().parents[5]))
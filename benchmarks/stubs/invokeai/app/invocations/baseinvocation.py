@@ -0,0 +1,67 @@
+# Minimal stand-in for InvokeAI's baseinvocation module so the node pack can be benchmarked without an InvokeAI
+# install. Only the parts of the API used by the pack are provided and they follow the pydantic v1 based InvokeAI 3.1.
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Literal, Optional
+
+from pydantic import BaseModel, Field
+from pydantic.fields import ModelField, Undefined
+
+
+class FieldDescriptions:
+    num_1 = "The first number"
+    num_2 = "The second number"
+
+
+class InvocationContext:
+    def __init__(self, services: Any = None, graph_execution_state_id: str = "benchmark"):
+        self.services = services
+        self.graph_execution_state_id = graph_execution_state_id
+
+
+def InputField(default: Any = Undefined, *, default_factory: Optional[Callable[[], Any]] = None, description: Optional[str] = None, **kwargs: Any) -> Any:
+    return Field(default=default, default_factory=default_factory, description=description, **kwargs)
+
+
+def OutputField(default: Any = Undefined, *, default_factory: Optional[Callable[[], Any]] = None, description: Optional[str] = None, **kwargs: Any) -> Any:
+    return Field(default=default, default_factory=default_factory, description=description, **kwargs)
+
+
+class BaseInvocationOutput(BaseModel):
+    pass
+
+
+class BaseInvocation(ABC, BaseModel):
+    id: str = Field(default="benchmark", description="The id of this instance of an invocation")
+    is_intermediate: bool = Field(default=False, description="Whether or not this is an intermediate invocation")
+    use_cache: bool = Field(default=True, description="Whether or not to use the cache")
+
+    class Config:
+        validate_assignment = True
+
+    @abstractmethod
+    def invoke(self, context: InvocationContext) -> BaseInvocationOutput:
+        pass
+
+
+def _add_type_field(cls: type, type_name: str) -> None:
+    annotation = Literal[type_name]
+    field = ModelField.infer(name="type", value=type_name, annotation=annotation, class_validators=None, config=cls.__config__)
+    cls.__fields__.update({"type": field})
+    cls.__annotations__.update({"type": annotation})
+
+
+def invocation(invocation_type: str, title: Optional[str] = None, tags: Optional[list[str]] = None, category: Optional[str] = None) -> Callable[[type], type]:
+    def wrapper(cls: type) -> type:
+        _add_type_field(cls, invocation_type)
+        return cls
+
+    return wrapper
+
+
+def invocation_output(output_type: str) -> Callable[[type], type]:
+    def wrapper(cls: type) -> type:
+        _add_type_field(cls, output_type)
+        return cls
+
+    return wrapper
@@ -0,0 +1,46 @@
+# Minimal stand-in for InvokeAI's primitives module, providing the outputs used by the node pack.
+
+from pydantic import BaseModel, Field
+
+from .baseinvocation import BaseInvocationOutput, OutputField, invocation_output
+
+
+@invocation_output("boolean_output")
+class BooleanOutput(BaseInvocationOutput):
+    value: bool = OutputField(description="The output boolean")
+
+
+@invocation_output("boolean_collection_output")
+class BooleanCollectionOutput(BaseInvocationOutput):
+    collection: list[bool] = OutputField(default_factory=list, description="The output boolean collection")
+
+
+@invocation_output("integer_output")
+class IntegerOutput(BaseInvocationOutput):
+    value: int = OutputField(description="The output integer")
+
+
+@invocation_output("integer_collection_output")
+class IntegerCollectionOutput(BaseInvocationOutput):
+    collection: list[int] = OutputField(default_factory=list, description="The int collection")
+
+
+@invocation_output("float_output")
+class FloatOutput(BaseInvocationOutput):
+    value: float = OutputField(description="The output float")
+
+
+@invocation_output("float_collection_output")
+class FloatCollectionOutput(BaseInvocationOutput):
+    collection: list[float] = OutputField(default_factory=list, description="The float collection")
+
+
+class ImageField(BaseModel):
+    image_name: str = Field(description="The name of the image")
+
+
+@invocation_output("image_output")
+class ImageOutput(BaseInvocationOutput):
+    image: ImageField = OutputField(description="The output image")
+    width: int = OutputField(description="The width of the image in pixels")
+    height: int = OutputField(description="The height of the image in pixels")
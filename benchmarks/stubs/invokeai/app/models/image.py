@@ -0,0 +1,16 @@
+# Minimal stand-in for InvokeAI's image models module, providing the enums used by the image nodes.
+
+from enum import Enum
+
+
+class ResourceOrigin(str, Enum):
+    INTERNAL = "internal"
+    EXTERNAL = "external"
+
+
+class ImageCategory(str, Enum):
+    GENERAL = "general"
+    MASK = "mask"
+    CONTROL = "control"
+    USER = "user"
+    OTHER = "other"
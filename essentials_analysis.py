@@ -0,0 +1,705 @@
+# Copyright (c) 2023 Andrew Lake (https://github.com/zealsprince) zealsprince.com
+
+from typing import NamedTuple, Tuple
+
+import ast
+import math
+
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_SINGLETON
+
+from .essentials import _EXPRESSION_CONSTANTS, _EXPRESSION_VARIABLES, _compile_expression, _expression_namespace
+from .essentials_fusion import _FUSABLE_INVOCATIONS, _FUSED_INVOCATIONS, _incoming_edges, _invocations, _topological_order
+
+
+class _Interval(NamedTuple):
+    """The closed range of values an input or output can take and whether they are all integers"""
+
+    low: float
+    high: float
+    integer: bool = False
+
+
+_UNBOUNDED = _Interval(-math.inf, math.inf)
+
+_BOOLEAN = _Interval(0.0, 1.0, True)
+
+# Collections known to be empty, whose element-wise operations have no values to fail on
+_EMPTY = "empty"
+
+# Collections entered in a node with up to this many values are analyzed value by value
+_LITERAL_ELEMENTS = 1024
+
+# Element-wise collection invocation types as (output kind, expression template of an element)
+_ELEMENTWISE_INVOCATIONS = {
+    "intcollectionadd": ("int", "a + b"),
+    "intcollectionsub": ("int", "a - b"),
+    "intcollectionmul": ("int", "a * b"),
+    "intcollectiondiv": ("int", "trunc(a / b)"),
+    "intcollectionmodulo": ("int", "a % b"),
+    "intcollectionabs": ("int", "abs(a)"),
+    "floatcollectionadd": ("float", "a + b"),
+    "floatcollectionsub": ("float", "a - b"),
+    "floatcollectionmul": ("float", "a * b"),
+    "floatcollectiondiv": ("float", "a / b"),
+    "floatcollectionmodulo": ("float", "a % b"),
+    "floatcollectionabs": ("float", "abs(a)"),
+    "floatcollectionpow": ("float", "pow(a, b)"),
+    "floatcollectionexpression": ("float", "a"),
+}
+
+# Invocation types whose output range follows from their inputs without an expression, as (output field, function
+# from the input ranges to the output range)
+_RANGE_INVOCATIONS = {
+    "boolrand": ("value", lambda inputs: _BOOLEAN),
+    "intrand": ("value", lambda inputs: _Interval(inputs["low"].low, inputs["high"].high, True)),
+    "floatrand": ("value", lambda inputs: _Interval(inputs["low"].low, inputs["high"].high)),
+    "intindexrand": ("value", lambda inputs: _Interval(inputs["low"].low, inputs["high"].high, True)),
+    "floatindexrand": ("value", lambda inputs: _Interval(inputs["low"].low, inputs["high"].high)),
+    "boolcollectionrand": ("collection", lambda inputs: _BOOLEAN),
+    "intcollectionrand": ("collection", lambda inputs: _Interval(inputs["low"].low, inputs["high"].high, True)),
+    "floatcollectionrand": ("collection", lambda inputs: _Interval(inputs["low"].low, inputs["high"].high)),
+    "intcollectionindexrand": ("collection", lambda inputs: _Interval(inputs["low"].low, inputs["high"].high, True)),
+    "floatcollectionindexrand": ("collection", lambda inputs: _Interval(inputs["low"].low, inputs["high"].high)),
+    "intrange": ("collection", lambda inputs: _hull(inputs["start"], inputs["stop"])),
+    "floatrange": ("collection", lambda inputs: _hull(inputs["start"], inputs["stop"])),
+    "intcollectionfilter": ("collection", lambda inputs: inputs["a"]),
+    "floatcollectionfilter": ("collection", lambda inputs: inputs["a"]),
+}
+
+# Reductions of the collection a as (function from its range to the range of the value)
+_REDUCTION_INVOCATIONS = {
+    "intcollectionsum": lambda a: _Interval(-math.inf if a.low < 0 else 0.0, math.inf if a.high > 0 else 0.0, True),
+    "intcollectionmin": lambda a: a,
+    "intcollectionmax": lambda a: a,
+    "intcollectionmean": lambda a: _Interval(a.low, a.high),
+    "intcollectionargmin": lambda a: _Interval(0.0, math.inf, True),
+    "intcollectionargmax": lambda a: _Interval(0.0, math.inf, True),
+    "floatcollectionsum": lambda a: _Interval(-math.inf if a.low < 0 else 0.0, math.inf if a.high > 0 else 0.0),
+    "floatcollectionmin": lambda a: a,
+    "floatcollectionmax": lambda a: a,
+    "floatcollectionmean": lambda a: a,
+    "floatcollectionargmin": lambda a: _Interval(0.0, math.inf, True),
+    "floatcollectionargmax": lambda a: _Interval(0.0, math.inf, True),
+}
+
+# Functions that never decrease, so their range is found by applying them to the bounds
+_MONOTONIC_FUNCTIONS = {
+    "trunc": (math.trunc, True),
+    "ceil": (math.ceil, True),
+    "floor": (math.floor, True),
+    "round": (round, True),
+    "sqrt": (math.sqrt, False),
+    "log": (math.log, False),
+    "sinh": (math.sinh, False),
+    "tanh": (math.tanh, False),
+    "asin": (math.asin, False),
+    "atan": (math.atan, False),
+    "asinh": (math.asinh, False),
+    "acosh": (math.acosh, False),
+    "atanh": (math.atanh, False),
+}
+
+# Ranges outside of which the math functions raise, as (lowest value, whether it is excluded, highest value,
+# whether it is excluded, description of the values that fail)
+_FUNCTION_DOMAINS = {
+    "sqrt": (0.0, False, math.inf, False, "square root of a negative value"),
+    "log": (0.0, True, math.inf, False, "logarithm of a value that is not positive"),
+    "asin": (-1.0, False, 1.0, False, "arc sine of a value outside of -1 to 1"),
+    "acos": (-1.0, False, 1.0, False, "arc cosine of a value outside of -1 to 1"),
+    "acosh": (1.0, False, math.inf, False, "inverse hyperbolic cosine of a value below 1"),
+    "atanh": (-1.0, True, 1.0, True, "inverse hyperbolic tangent of a value outside of -1 to 1 exclusive"),
+}
+
+
+class DomainViolation(BaseModel):
+    """An operation of a node that raises for some or, if guaranteed, for all values its inputs can take"""
+
+    node_id: str
+    type: str
+    message: str
+    guaranteed: bool
+
+
+class AnalysisReport(BaseModel):
+    """The domain violations found in a graph and the ranges of the node outputs they were derived from"""
+
+    nodes_analyzed: int = 0
+    nodes_skipped: int = 0
+    violations: list[DomainViolation] = []
+    ranges: dict[str, Tuple[float, float]] = {}
+
+
+def _format(interval: _Interval) -> str:
+    return f"[{interval.low:g}, {interval.high:g}]"
+
+
+def _hull(*intervals: _Interval) -> _Interval:
+    return _Interval(min(interval.low for interval in intervals), max(interval.high for interval in intervals), all(interval.integer for interval in intervals))
+
+
+def _bounds(function, low: float, high: float, integer: bool = False) -> _Interval:
+    """Applies a non-decreasing function to the bounds of a range
+
+    Bounds that overflow become infinite, as do bounds on the edge of the domain of a function that tends to
+    infinity there, like log(0) or atanh(1).
+    """
+
+    def apply(value: float, limit: float) -> float:
+        try:
+            return float(function(value))
+        except OverflowError:
+            return math.copysign(math.inf, value)
+        except ValueError:
+            return limit
+
+    return _Interval(apply(low, -math.inf), apply(high, math.inf), integer)
+
+
+def _combinations(function, a: _Interval, b: _Interval, integer: bool = False) -> _Interval:
+    """Takes the range of a function that is monotonic in both arguments from the combinations of their bounds"""
+
+    values = []
+
+    for x in (a.low, a.high):
+        for y in (b.low, b.high):
+            try:
+                value = function(x, y)
+            except (OverflowError, ZeroDivisionError):
+                return _UNBOUNDED
+            except ValueError:
+                continue
+
+            # Zero times infinity can only come from a bound that is never reached
+            values.append(0.0 if math.isnan(value) else value)
+
+    return _Interval(min(values), max(values), integer) if values else _UNBOUNDED
+
+
+def _floor_quotient(a: _Interval, b: _Interval) -> _Interval:
+    """Returns the range of a // b for a divisor that can not be zero"""
+
+    quotient = _combinations(lambda x, y: x / y, a, b)
+
+    # A quotient that rounds up onto a whole number is floor divided to the number below it
+    low = quotient.low - 1 if quotient.low.is_integer() else quotient.low
+
+    return _bounds(math.floor, low, quotient.high, True)
+
+
+def _truth(interval: _Interval) -> _Interval:
+    if interval.low > 0 or interval.high < 0:
+        return _Interval(1.0, 1.0, True)
+
+    if interval.low == interval.high == 0:
+        return _Interval(0.0, 0.0, True)
+
+    return _BOOLEAN
+
+
+def _compare(operator: ast.cmpop, a: _Interval, b: _Interval) -> _Interval:
+    """Decides a comparison if it has the same result for every value in the ranges"""
+
+    always, never = {
+        ast.Eq: (a.low == a.high == b.low == b.high, a.high < b.low or b.high < a.low),
+        ast.NotEq: (a.high < b.low or b.high < a.low, a.low == a.high == b.low == b.high),
+        ast.Gt: (a.low > b.high, a.high <= b.low),
+        ast.GtE: (a.low >= b.high, a.high < b.low),
+        ast.Lt: (a.high < b.low, a.low >= b.high),
+        ast.LtE: (a.high <= b.low, a.low > b.high),
+    }[type(operator)]
+
+    return _Interval(1.0, 1.0, True) if always else _Interval(0.0, 0.0, True) if never else _BOOLEAN
+
+
+def _constant(value):
+    """Returns the range of a field value or of the values of a collection, _EMPTY for empty collections"""
+
+    if isinstance(value, (bool, int, float)):
+        return _Interval(float(value), float(value), isinstance(value, int))
+
+    if isinstance(value, list):
+        values = [item for item in value if isinstance(item, (bool, int, float))]
+
+        if len(values) != len(value):
+            return _UNBOUNDED
+
+        return _hull(*(_constant(item) for item in values)) if values else _EMPTY
+
+    return _UNBOUNDED
+
+
+def _cast(interval: _Interval, field) -> _Interval:
+    """Converts the range of a connected value like pydantic converts the value for an integer or boolean field"""
+
+    if field.type_ is bool:
+        return _truth(interval)
+
+    if isinstance(field.type_, type) and issubclass(field.type_, int) and not interval.integer:
+        return _bounds(math.trunc, interval.low, interval.high, True)
+
+    return interval
+
+
+class _Evaluator:
+    """Evaluates an expression tree over ranges instead of values, recording the operations that can raise"""
+
+    def __init__(self, variables: dict):
+        self.variables = variables
+        self.violations = []
+
+    def violation(self, possible: bool, guaranteed: bool, certain: bool, message: str) -> None:
+        if possible:
+            self.violations.append((message, guaranteed and certain))
+
+    def divisor(self, interval: _Interval, certain: bool) -> None:
+        self.violation(
+            interval.low <= 0 <= interval.high,
+            interval.low == interval.high == 0,
+            certain,
+            f"division by zero with a divisor in {_format(interval)}",
+        )
+
+    def domain(self, function: str, interval: _Interval, certain: bool) -> None:
+        low, low_excluded, high, high_excluded, description = _FUNCTION_DOMAINS[function]
+        below = interval.low < low or low_excluded and interval.low == low
+        above = interval.high > high or high_excluded and interval.high == high
+        entirely = interval.high < low or low_excluded and interval.high == low or interval.low > high or high_excluded and interval.low == high
+
+        self.violation(below or above, entirely, certain, f"{description} in {_format(interval)}")
+
+    def evaluate(self, node: ast.AST, certain: bool = True) -> _Interval:
+        """Returns the range of an expression, certain tells whether it is evaluated for every value of the inputs"""
+
+        if isinstance(node, ast.Expression):
+            return self.evaluate(node.body, certain)
+
+        if isinstance(node, ast.Constant):
+            return _constant(float(node.value))
+
+        if isinstance(node, ast.Name):
+            if node.id in _EXPRESSION_CONSTANTS:
+                return _constant(_EXPRESSION_CONSTANTS[node.id])
+
+            return self.variables.get(node.id, _UNBOUNDED)
+
+        if isinstance(node, ast.UnaryOp):
+            operand = self.evaluate(node.operand, certain)
+
+            if isinstance(node.op, ast.USub):
+                return _Interval(-operand.high, -operand.low, operand.integer)
+
+            if isinstance(node.op, ast.Not):
+                truth = _truth(operand)
+                return _Interval(1 - truth.high, 1 - truth.low, True)
+
+            return operand
+
+        if isinstance(node, ast.BinOp):
+            return self.binary(node.op, self.evaluate(node.left, certain), self.evaluate(node.right, certain), certain)
+
+        if isinstance(node, ast.Compare):
+            return _compare(node.ops[0], self.evaluate(node.left, certain), self.evaluate(node.comparators[0], certain))
+
+        if isinstance(node, ast.IfExp):
+            test = _truth(self.evaluate(node.test, certain))
+
+            # Only a branch that is taken for every value of the inputs raises for certain
+            if test.low == 1:
+                return self.evaluate(node.body, certain)
+
+            if test.high == 0:
+                return self.evaluate(node.orelse, certain)
+
+            return _hull(self.evaluate(node.body, False), self.evaluate(node.orelse, False))
+
+        if isinstance(node, ast.BoolOp):
+            # Python returns the first operand that decides the result, later operands are only evaluated if the
+            # earlier ones did not decide it
+            results = []
+
+            for value in node.values:
+                result = self.evaluate(value, certain)
+                truth = _truth(result)
+                decides = truth.low == 1 if isinstance(node.op, ast.Or) else truth.high == 0
+                passes = truth.high == 0 if isinstance(node.op, ast.Or) else truth.low == 1
+
+                results.append(result)
+
+                if decides:
+                    break
+
+                certain = certain and passes
+
+            return _hull(*results)
+
+        if isinstance(node, ast.Call):
+            return self.call(node.func.id, [self.evaluate(argument, certain) for argument in node.args], certain)
+
+        return _UNBOUNDED
+
+    def binary(self, operator: ast.operator, a: _Interval, b: _Interval, certain: bool) -> _Interval:
+        integer = a.integer and b.integer
+
+        if isinstance(operator, ast.Add):
+            return _Interval(a.low + b.low, a.high + b.high, integer)
+
+        if isinstance(operator, ast.Sub):
+            return _Interval(a.low - b.high, a.high - b.low, integer)
+
+        if isinstance(operator, ast.Mult):
+            return _combinations(lambda x, y: x * y, a, b, integer)
+
+        if isinstance(operator, ast.Pow):
+            return self.power(a, b, certain)
+
+        self.divisor(b, certain)
+
+        if b.low <= 0 <= b.high:
+            return _UNBOUNDED
+
+        if isinstance(operator, ast.Div):
+            return _combinations(lambda x, y: x / y, a, b)
+
+        if isinstance(operator, ast.FloorDiv):
+            return _floor_quotient(a, b)
+
+        # The remainder takes the sign of the divisor and stays below it in magnitude
+        return _Interval(min(b.low, 0.0), max(b.high, 0.0), integer)
+
+    def power(self, a: _Interval, b: _Interval, certain: bool) -> _Interval:
+        whole = b.integer or b.low == b.high and float(b.low).is_integer()
+
+        self.violation(
+            a.low <= 0 <= a.high and b.low < 0,
+            a.low == a.high == 0 and b.high < 0,
+            certain,
+            f"zero raised to a negative power in {_format(b)}",
+        )
+        self.violation(
+            a.low < 0 and not whole,
+            a.high < 0 and b.low == b.high and not whole,
+            certain,
+            f"negative value in {_format(a)} raised to a fractional power",
+        )
+
+        if a.low >= 0 and (a.low > 0 or b.low >= 0):
+            return _combinations(math.pow, a, b)
+
+        return _UNBOUNDED
+
+    def call(self, function: str, arguments: list, certain: bool) -> _Interval:
+        a = arguments[0] if arguments else _UNBOUNDED
+
+        if function in ("log", "logn") and len(arguments) == 2:
+            n = arguments[1]
+
+            self.domain("log", a, certain)
+            self.violation(
+                n.low <= 0 or n.low <= 1 <= n.high,
+                n.high <= 0 or n.low == n.high == 1,
+                certain,
+                f"logarithm to a base in {_format(n)} that is not positive or 1",
+            )
+
+            if n.low > 0 and not n.low <= 1 <= n.high and a.high > 0:
+                return self.binary(ast.Div(), _bounds(math.log, max(a.low, 0.0), a.high), _bounds(math.log, n.low, n.high), certain)
+
+            return _UNBOUNDED
+
+        if function in _FUNCTION_DOMAINS:
+            self.domain(function, a, certain)
+
+        # Single values are evaluated exactly, failures are left to the checks below
+        if arguments and all(argument.low == argument.high for argument in arguments):
+            try:
+                value = float(_expression_namespace(False)[function](*(argument.low for argument in arguments)))
+            except (ArithmeticError, ValueError):
+                pass
+            else:
+                return _Interval(value, value, value.is_integer() and (a.integer or function in ("trunc", "ceil", "floor", "round")))
+
+        if function == "abs":
+            if a.low >= 0:
+                return a
+
+            return _Interval(-a.high, -a.low, a.integer) if a.high <= 0 else _Interval(0.0, max(-a.low, a.high), a.integer)
+
+        if function == "round" and len(arguments) == 2:
+            return _UNBOUNDED
+
+        if function == "roundtomultiple" and len(arguments) == 2:
+            n = arguments[1]
+
+            self.divisor(n, certain)
+
+            if n.low <= 0 <= n.high:
+                return _UNBOUNDED
+
+            return _combinations(lambda x, y: x * y, _floor_quotient(a, n), n)
+
+        if function == "pow" and len(arguments) == 2:
+            return self.power(a, arguments[1], certain)
+
+        if function == "acos":
+            # The arc cosine decreases, so the bounds swap
+            return _Interval(math.acos(min(max(a.high, -1.0), 1.0)), math.acos(min(max(a.low, -1.0), 1.0)))
+
+        if function in ("sin", "cos"):
+            return _Interval(-1.0, 1.0)
+
+        if function == "cosh":
+            nearest = 0.0 if a.low <= 0 <= a.high else min(abs(a.low), abs(a.high))
+            return _bounds(math.cosh, nearest, max(abs(a.low), abs(a.high)))
+
+        if function in _MONOTONIC_FUNCTIONS:
+            monotonic, integer = _MONOTONIC_FUNCTIONS[function]
+            low, high = a.low, a.high
+
+            # Bounds outside of the domain are clamped to it, as values there raise instead of producing a result
+            if function in _FUNCTION_DOMAINS:
+                domain = _FUNCTION_DOMAINS[function]
+                low, high = min(max(low, domain[0]), domain[2]), max(min(high, domain[2]), domain[0])
+
+            return _bounds(monotonic, low, high, integer)
+
+        return _UNBOUNDED
+
+
+def _output_cast(kind: str, interval: _Interval) -> _Interval:
+    """Applies the conversion of an expression result to the output of an invocation"""
+
+    if kind == "int":
+        return _bounds(math.trunc, interval.low, interval.high, True)
+
+    if kind == "bool":
+        return _truth(interval)
+
+    return interval
+
+
+def _analyze_expression(expression: str, kind: str, variables: dict) -> tuple:
+    """Returns the output range of an invocation expression and its violations as (message, guaranteed)"""
+
+    evaluator = _Evaluator(variables)
+    result = evaluator.evaluate(ast.parse(expression.strip(), mode="eval"))
+
+    return _output_cast(kind, result), evaluator.violations
+
+
+def _analyze_literals(template: str, kind: str, collections: dict) -> tuple:
+    """Analyzes an element-wise operation on collections entered in the node element by element, which is exact"""
+
+    sizes = {len(collection) for collection in collections.values() if len(collection) != 1}
+
+    if len(sizes) > 1:
+        return {}, [(f"collections of sizes {sorted(sizes)} can not be broadcast together", True)]
+
+    size = max((len(collection) for collection in collections.values()), default=1)
+
+    # Longer collections are analyzed by their range
+    if size > _LITERAL_ELEMENTS:
+        return _analyze_expression(template, kind, {name: _constant(collection) for name, collection in collections.items()})
+
+    results = []
+    violations = []
+
+    for index in range(size):
+        variables = {name: _constant(collection[index % len(collection)]) for name, collection in collections.items()}
+        value, element_violations = _analyze_expression(template, kind, variables)
+
+        # The first element that raises fails the node
+        if any(guaranteed for _, guaranteed in element_violations):
+            return {}, [violation for violation in element_violations if violation[1]][:1]
+
+        violations += [violation for violation in element_violations if violation not in violations]
+        results.append(value)
+
+    return {"collection": _hull(*results)}, violations
+
+
+def _check_constraints(cls: type, inputs: dict) -> list:
+    """Returns the violations of the ge, gt, le and lt constraints of the single value inputs of an invocation
+
+    Pydantic rejects a value outside those constraints when it is assigned, so the node fails before it runs.
+    The inputs are narrowed to the values that pass.
+    """
+
+    violations = []
+
+    for name, field in cls.__fields__.items():
+        interval = inputs.get(name)
+        info = field.field_info
+
+        if not isinstance(interval, _Interval) or field.shape != SHAPE_SINGLETON:
+            continue
+
+        low = max((limit for limit in (info.ge, info.gt) if limit is not None), default=-math.inf)
+        high = min((limit for limit in (info.le, info.lt) if limit is not None), default=math.inf)
+        low_excluded, high_excluded = info.gt is not None and info.gt >= low, info.lt is not None and info.lt <= high
+
+        below = interval.low < low or low_excluded and interval.low == low
+        above = interval.high > high or high_excluded and interval.high == high
+        entirely = interval.high < low or low_excluded and interval.high == low or interval.low > high or high_excluded and interval.low == high
+
+        if below or above:
+            bounds = f"{'(' if low_excluded else '['}{low:g}, {high:g}{')' if high_excluded else ']'}"
+            violations.append((f"{name} in {_format(interval)} outside of {bounds}", entirely))
+
+        if not entirely:
+            inputs[name] = _Interval(max(interval.low, low), min(interval.high, high), interval.integer)
+
+    return violations
+
+
+def _analyze_node(node: dict, inputs: dict, literals: dict) -> tuple:
+    """Returns the output ranges of a node by output field and its violations as (message, guaranteed)
+
+    Literals holds the values of the fields that are not connected to other nodes.
+    """
+
+    invocation_type = node["type"]
+
+    if invocation_type in _FUSABLE_INVOCATIONS:
+        kind, template, _ = _FUSABLE_INVOCATIONS[invocation_type]
+
+        if invocation_type in _FUSED_INVOCATIONS.values():
+            template = node.get("expression", template)
+
+            try:
+                _compile_expression(template)
+            except ValueError as error:
+                return {}, [(str(error), True)]
+
+        value, violations = _analyze_expression(template, kind, inputs)
+
+        return {"value": value}, violations
+
+    if invocation_type in _ELEMENTWISE_INVOCATIONS:
+        kind, template = _ELEMENTWISE_INVOCATIONS[invocation_type]
+
+        if invocation_type == "floatcollectionexpression":
+            template = node.get("expression", template)
+
+        try:
+            code = _compile_expression(template, conditionals=False)
+        except ValueError as error:
+            return {}, [(str(error), True)]
+
+        names = [name for name in _EXPRESSION_VARIABLES if name in code.co_names]
+
+        # Empty collections broadcast to an empty result, which has no values to raise on
+        if any(inputs[name] is _EMPTY for name in names):
+            return {"collection": _EMPTY}, []
+
+        if all(isinstance(literals.get(name), list) for name in names):
+            return _analyze_literals(template, kind, {name: literals[name] for name in names})
+
+        collection, violations = _analyze_expression(template, kind, inputs)
+
+        return {"collection": collection}, violations
+
+    if invocation_type in _REDUCTION_INVOCATIONS:
+        a = inputs["a"]
+
+        if a is _EMPTY:
+            if invocation_type.endswith("sum"):
+                return {"value": _constant(0)}, []
+
+            return {}, [("reduction of an empty collection", True)]
+
+        return {"value": _REDUCTION_INVOCATIONS[invocation_type](a)}, []
+
+    if invocation_type in _RANGE_INVOCATIONS:
+        field, function = _RANGE_INVOCATIONS[invocation_type]
+        violations = []
+        step = inputs.get("step", _UNBOUNDED)
+
+        if "step" in inputs and step.low <= 0 <= step.high:
+            violations.append((f"range step of zero with a step in {_format(step)}", step.low == step.high == 0))
+
+        if any(value is _EMPTY for value in inputs.values()):
+            return {field: _EMPTY}, violations
+
+        return {field: function(inputs)}, violations
+
+    return {}, []
+
+
+def analyze_graph(graph: dict) -> AnalysisReport:
+    """Propagates the ranges of values through the essentials nodes of a graph to find operations that can raise
+
+    The graph is expected in the session graph format of nodes keyed by id and a list of edges, as taken by
+    fuse_graph. Outputs of other nodes are assumed to take any value. A violation is guaranteed if the node raises
+    for every value its inputs can take, so the graph can be rejected before it executes. Nodes after a guaranteed
+    violation never execute and are skipped.
+    """
+
+    invocations = _invocations()
+    incoming = _incoming_edges(graph)
+    report = AnalysisReport()
+    outputs = {}
+
+    for node_id in _topological_order(graph):
+        node = graph["nodes"][node_id]
+        cls = invocations.get(node.get("type"))
+        outputs[node_id] = {}
+
+        if cls is None:
+            continue
+
+        sources = {name: incoming.get((node_id, name)) for name in cls.__fields__}
+
+        # A node with an input from a node that always raises never executes
+        if any(edge is not None and outputs[edge["source"]["node_id"]] is None for edge in sources.values()):
+            outputs[node_id] = None
+            report.nodes_skipped += 1
+            continue
+
+        inputs = {}
+        literals = {}
+
+        for name, field in cls.__fields__.items():
+            edge = sources[name]
+
+            if edge is None:
+                literals[name] = node.get(name, field.get_default())
+                inputs[name] = _constant(literals[name])
+            else:
+                inputs[name] = outputs[edge["source"]["node_id"]].get(edge["source"]["field"], _UNBOUNDED)
+                inputs[name] = inputs[name] if inputs[name] is _EMPTY else _cast(inputs[name], field)
+
+        violations = _check_constraints(cls, inputs)
+
+        if not any(guaranteed for _, guaranteed in violations):
+            ranges, node_violations = _analyze_node(node, inputs, literals)
+            violations += node_violations
+
+        report.nodes_analyzed += 1
+
+        for message, guaranteed in violations:
+            report.violations.append(DomainViolation(node_id=node_id, type=node["type"], message=message, guaranteed=guaranteed))
+
+        if any(guaranteed for _, guaranteed in violations):
+            outputs[node_id] = None
+            continue
+
+        outputs[node_id] = ranges
+
+        for interval in ranges.values():
+            if isinstance(interval, _Interval):
+                report.ranges[node_id] = (interval.low, interval.high)
+
+    return report
+
+
+def check_graph(graph: dict, possible: bool = False) -> AnalysisReport:
+    """Analyzes a graph and raises a ValueError listing its guaranteed domain violations, or all with possible set"""
+
+    report = analyze_graph(graph)
+    violations = [violation for violation in report.violations if violation.guaranteed or possible]
+
+    if violations:
+        raise ValueError("Graph will fail:\n" + "\n".join(f"{violation.node_id} ({violation.type}): {violation.message}" for violation in violations))
+
+    return report
@@ -0,0 +1,644 @@
+# Copyright (c) 2023 Andrew Lake (https://github.com/zealsprince) zealsprince.com
+
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import ast
+import copy
+import math
+import time
+
+from pydantic import BaseModel
+
+from .baseinvocation import BaseInvocation
+
+from . import essentials
+from .essentials import _EXPRESSION_VARIABLES, _compile_expression, _evaluate_expression
+
+_SWITCH = "a if index == 0 else b if index == 1 else c if index == 2 else d"
+
+# Pure invocation types as (output kind, expression template, input fields and their defaults). The expression
+# invocations use their own expression field as the template.
+_FUSABLE_INVOCATIONS = {
+    "booltoint": ("int", "a", {"a": True}),
+    "booltofloat": ("float", "a", {"a": True}),
+    "boolnot": ("bool", "a == 0", {"a": False}),
+    "boolequals": ("bool", "a == b", {"a": True, "b": True}),
+    "inttobool": ("bool", "a != 0", {"a": 0}),
+    "inttofloat": ("float", "a", {"a": 0}),
+    "intadd": ("int", "a + b", {"a": 0, "b": 0}),
+    "intsub": ("int", "a - b", {"a": 0, "b": 0}),
+    "intmul": ("int", "a * b", {"a": 0, "b": 0}),
+    "intdiv": ("int", "trunc(a / b)", {"a": 0, "b": 0}),
+    "intmodulo": ("int", "a % b", {"a": 0, "b": 0}),
+    "intabs": ("int", "abs(a)", {"a": 0}),
+    "intequals": ("bool", "a == b", {"a": 1, "b": 1}),
+    "intgreater": ("bool", "a > b", {"a": 1, "b": 1}),
+    "intgreaterequals": ("bool", "a >= b", {"a": 1, "b": 1}),
+    "intless": ("bool", "a < b", {"a": 1, "b": 1}),
+    "intlessequals": ("bool", "a <= b", {"a": 1, "b": 1}),
+    "floattobool": ("bool", "a != 0", {"a": 0.0}),
+    "floattoint": ("int", "trunc(a)", {"a": 0.0}),
+    "floatadd": ("float", "a + b", {"a": 0.0, "b": 0.0}),
+    "floatsub": ("float", "a - b", {"a": 0.0, "b": 0.0}),
+    "floatmul": ("float", "a * b", {"a": 0.0, "b": 0.0}),
+    "floatdiv": ("float", "a / b", {"a": 0.0, "b": 0.0}),
+    "floatmodulo": ("float", "a % b", {"a": 0.0, "b": 0.0}),
+    "floatabs": ("float", "abs(a)", {"a": 0.0}),
+    "floatround": ("int", "round(a)", {"a": 0.0}),
+    "floatroundtomultiple": ("int", "trunc(roundtomultiple(a, n))", {"a": 0.0, "n": 8.0}),
+    "floatceil": ("int", "ceil(a)", {"a": 0.0}),
+    "floatfloor": ("int", "floor(a)", {"a": 0.0}),
+    "floatpow": ("float", "pow(a, b)", {"a": 0.0, "b": 0}),
+    "floatsqrt": ("float", "sqrt(a)", {"a": 0.0}),
+    "floatlog": ("float", "log(a)", {"a": 0.0}),
+    "floatlogn": ("float", "log(a, n)", {"a": 0.0, "n": 0}),
+    "floatsin": ("float", "sin(a)", {"a": 0.0}),
+    "floatcos": ("float", "cos(a)", {"a": 0.0}),
+    "floattan": ("float", "tan(a)", {"a": 0.0}),
+    "floatsinh": ("float", "sinh(a)", {"a": 0.0}),
+    "floatcosh": ("float", "cosh(a)", {"a": 0.0}),
+    "floattanh": ("float", "tanh(a)", {"a": 0.0}),
+    "floatasin": ("float", "asin(a)", {"a": 0.0}),
+    "floatacos": ("float", "acos(a)", {"a": 0.0}),
+    "floatatan": ("float", "atan(a)", {"a": 0.0}),
+    "floatasinh": ("float", "asinh(a)", {"a": 0.0}),
+    "floatacosh": ("float", "acosh(a)", {"a": 0.0}),
+    "floatatanh": ("float", "atanh(a)", {"a": 0.0}),
+    "floatequals": ("bool", "a == b", {"a": 1.0, "b": 1.0}),
+    "floatgreater": ("bool", "a > b", {"a": 1.0, "b": 1.0}),
+    "floatgreaterequals": ("bool", "a >= b", {"a": 1.0, "b": 1.0}),
+    "floatless": ("bool", "a < b", {"a": 1.0, "b": 1.0}),
+    "floatlessequals": ("bool", "a <= b", {"a": 1.0, "b": 1.0}),
+    "booland": ("bool", "a and b", {"a": True, "b": True}),
+    "boolor": ("bool", "a or b", {"a": True, "b": True}),
+    "intselect": ("int", "a if condition else b", {"condition": True, "a": 0, "b": 0}),
+    "floatselect": ("float", "a if condition else b", {"condition": True, "a": 0.0, "b": 0.0}),
+    "boolselect": ("bool", "a if condition else b", {"condition": True, "a": True, "b": False}),
+    "intswitch": ("int", _SWITCH, {"index": 0, "a": 0, "b": 0, "c": 0, "d": 0}),
+    "floatswitch": ("float", _SWITCH, {"index": 0, "a": 0.0, "b": 0.0, "c": 0.0, "d": 0.0}),
+    "boolswitch": ("bool", _SWITCH, {"index": 0, "a": False, "b": False, "c": False, "d": False}),
+    "floatexpression": ("float", "a", {"a": 0.0, "b": 0.0, "c": 0.0, "d": 0.0}),
+    "intexpression": ("int", "a", {"a": 0.0, "b": 0.0, "c": 0.0, "d": 0.0}),
+    "boolexpression": ("bool", "a > b", {"a": 0.0, "b": 0.0, "c": 0.0, "d": 0.0}),
+}
+
+# Integer arithmetic, comparisons and pass-throughs, which would lose exactness beyond 2^53 as the variables of the
+# expression nodes are floats, so they are left to run as they are
+_INTEGER_INVOCATIONS = frozenset({
+    "intadd", "intsub", "intmul", "intdiv", "intmodulo", "intabs",
+    "intequals", "intgreater", "intgreaterequals", "intless", "intlessequals",
+    "intselect", "intswitch",
+})
+
+_FUSED_INVOCATIONS = {"float": "floatexpression", "int": "intexpression", "bool": "boolexpression"}
+
+_FUSED_CASTS = {"float": float, "int": int, "bool": bool}
+
+_INPUT_PREFIX = "_input"
+
+# Syntax tree nodes of the largest formula inlined into its consumers, larger ones are passed on as inputs
+_MAX_INLINED_NODES = 64
+
+# Syntax tree nodes of the longest expression a subgraph is fused into
+_MAX_FORMULA_NODES = 512
+
+# Branching invocation types as (deciding field, function from its value to the field whose value is output)
+_BRANCH_INVOCATIONS = {
+    "booland": ("a", lambda a: "b" if a else "a"),
+    "boolor": ("a", lambda a: "a" if a else "b"),
+    "intselect": ("condition", lambda condition: "a" if condition else "b"),
+    "floatselect": ("condition", lambda condition: "a" if condition else "b"),
+    "boolselect": ("condition", lambda condition: "a" if condition else "b"),
+    "intswitch": ("index", lambda index: _EXPRESSION_VARIABLES[int(index)] if 0 <= index <= 3 else None),
+    "floatswitch": ("index", lambda index: _EXPRESSION_VARIABLES[int(index)] if 0 <= index <= 3 else None),
+    "boolswitch": ("index", lambda index: _EXPRESSION_VARIABLES[int(index)] if 0 <= index <= 3 else None),
+}
+
+
+class FusionReport(BaseModel):
+    """Node counts and optional evaluation timings of a graph before and after fusion"""
+
+    nodes_before: int
+    nodes_after: int
+    fused_nodes: int = 0
+    folded_values: int = 0
+    skipped_subgraphs: int = 0
+    pruned_nodes: int = 0
+    seconds_before: Optional[float] = None
+    seconds_after: Optional[float] = None
+
+
+class _Substitute(ast.NodeTransformer):
+    """Replaces variable names in an expression tree with other expression trees"""
+
+    def __init__(self, replacements: dict):
+        self.replacements = replacements
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id in self.replacements:
+            return copy.deepcopy(self.replacements[node.id])
+
+        return node
+
+
+@lru_cache(maxsize=None)
+def _constraints(invocation_type: str) -> dict:
+    """Returns the (ge, gt, le, lt) constraints of the fields of an invocation that pydantic validates to a range"""
+
+    constraints = {}
+
+    for name, field in _invocations()[invocation_type].__fields__.items():
+        info = field.field_info
+        limits = (info.ge, info.gt, info.le, info.lt)
+
+        if any(limit is not None for limit in limits):
+            constraints[name] = limits
+
+    return constraints
+
+
+def _satisfies(limits: tuple, value) -> bool:
+    ge, gt, le, lt = limits
+
+    return (ge is None or value >= ge) and (gt is None or value > gt) and (le is None or value <= le) and (lt is None or value < lt)
+
+
+def _template(node: dict) -> Optional[str]:
+    """Returns the expression template of a node or None if it can not be fused"""
+
+    if node.get("type") not in _FUSABLE_INVOCATIONS or node["type"] in _INTEGER_INVOCATIONS:
+        return None
+
+    _, template, fields = _FUSABLE_INVOCATIONS[node["type"]]
+
+    # Expressions can not reject values out of the range of a field, like a switch index of 5, so those are left
+    # for the invocation to reject
+    for field, limits in _constraints(node["type"]).items():
+        if field in fields and not _satisfies(limits, node.get(field, fields[field])):
+            return None
+
+    if node["type"] in _FUSED_INVOCATIONS.values():
+        template = node.get("expression", template)
+
+        try:
+            _compile_expression(template)
+        except ValueError:
+            return None
+
+    return template
+
+
+def _incoming_edges(graph: dict) -> dict:
+    return {(edge["destination"]["node_id"], edge["destination"]["field"]): edge for edge in graph["edges"]}
+
+
+def _fusable_nodes(graph: dict) -> set:
+    """Finds the pure nodes whose inputs can all be expressed as expression variables or constants"""
+
+    nodes = graph["nodes"]
+    incoming = _incoming_edges(graph)
+    fusable = {node_id for node_id, node in nodes.items() if _template(node) is not None}
+
+    changed = True
+
+    while changed:
+        changed = False
+
+        for (node_id, field), edge in incoming.items():
+            if node_id not in fusable:
+                continue
+
+            fields = _FUSABLE_INVOCATIONS[nodes[node_id]["type"]][2]
+            external = edge["source"]["node_id"] not in fusable
+
+            # Expression variables are floats so booleans from other nodes can not be connected to them, and values
+            # connected to fields with a range are only validated by the invocation itself
+            if field not in fields or field in _constraints(nodes[node_id]["type"]) or (external and isinstance(fields[field], bool)):
+                fusable.discard(node_id)
+                changed = True
+
+    return fusable
+
+
+def _components(graph: dict, fusable: set) -> list:
+    """Groups the fusable nodes into connected subgraphs"""
+
+    neighbours = {node_id: set() for node_id in fusable}
+
+    for edge in graph["edges"]:
+        source, destination = edge["source"]["node_id"], edge["destination"]["node_id"]
+
+        if source in fusable and destination in fusable:
+            neighbours[source].add(destination)
+            neighbours[destination].add(source)
+
+    components = []
+    visited = set()
+
+    for node_id in sorted(fusable):
+        if node_id in visited:
+            continue
+
+        component = set()
+        stack = [node_id]
+
+        while stack:
+            current = stack.pop()
+
+            if current in component:
+                continue
+
+            component.add(current)
+            stack.extend(neighbours[current] - component)
+
+        visited |= component
+        components.append(component)
+
+    return components
+
+
+def _formula(node_id: str, graph: dict, incoming: dict, component: set, shared: set, inputs: dict, formulas: dict) -> ast.expr:
+    """Builds the expression tree of a node by substituting its inputs, recursing into fused sources
+
+    Sources consumed more than once within the component are not inlined but passed in as inputs, so that the
+    tree stays linear in the size of the subgraph instead of repeating them, unless they are constant. The same
+    goes for sources with large formulas, which splits long chains into several expressions. Constant subtrees
+    are evaluated into a single value.
+    """
+
+    if node_id in formulas:
+        return formulas[node_id]
+
+    node = graph["nodes"][node_id]
+    kind, _, fields = _FUSABLE_INVOCATIONS[node["type"]]
+    replacements = {}
+
+    for field, default in fields.items():
+        edge = incoming.get((node_id, field))
+
+        if edge is None:
+            replacements[field] = ast.Constant(value=float(node.get(field, default)))
+            continue
+
+        source = (edge["source"]["node_id"], edge["source"]["field"])
+
+        if source[0] in component:
+            formula = _formula(source[0], graph, incoming, component, shared, inputs, formulas)
+
+            if isinstance(formula, ast.Constant) or (source[0] not in shared and sum(1 for _ in ast.walk(formula)) <= _MAX_INLINED_NODES):
+                replacements[field] = formula
+                continue
+
+        name = inputs.setdefault(source, f"{_INPUT_PREFIX}{len(inputs)}")
+        replacements[field] = ast.Name(id=name, ctx=ast.Load())
+
+    tree = _Substitute(replacements).visit(ast.parse(_template(node), mode="eval").body)
+
+    if not any(isinstance(child, ast.Name) and child.id.startswith(_INPUT_PREFIX) for child in ast.walk(tree)):
+        try:
+            value = float(_FUSED_CASTS[kind](_evaluate_expression(_compile_expression(ast.unparse(tree)), {})))
+        except (ArithmeticError, ValueError):
+            # Errors are left for the fused node to raise when the graph actually executes
+            pass
+        else:
+            if math.isfinite(value):
+                tree = ast.Constant(value=value)
+
+    formulas[node_id] = tree
+
+    return tree
+
+
+def _fuse_component(graph: dict, component: set, report: FusionReport) -> None:
+    """Replaces a connected subgraph with one expression node per output, folding constant outputs
+
+    Nodes consumed more than once within the subgraph are outputs of their own, passing their value on to the
+    nodes consuming them.
+    """
+
+    nodes, edges = graph["nodes"], graph["edges"]
+    incoming = _incoming_edges(graph)
+    inputs = {}
+    formulas = {}
+
+    exits = {}
+    shared = set()
+
+    for node_id in sorted(component):
+        consumers = [edge for edge in edges if edge["source"]["node_id"] == node_id]
+
+        if not consumers or any(edge["destination"]["node_id"] not in component for edge in consumers):
+            exits[node_id] = consumers
+
+        if sum(edge["destination"]["node_id"] in component for edge in consumers) > 1:
+            shared.add(node_id)
+
+    for node_id in list(exits):
+        _formula(node_id, graph, incoming, component, shared, inputs, formulas)
+
+    # Nodes passed on as inputs have to be computed by fused nodes of their own
+    for node_id in sorted(component):
+        if (node_id, "value") in inputs:
+            exits.setdefault(node_id, [edge for edge in edges if edge["source"]["node_id"] == node_id])
+
+    fused = {}
+
+    for node_id in exits:
+        tree = formulas[node_id]
+        used = sorted({node.id for node in ast.walk(tree) if isinstance(node, ast.Name) and node.id.startswith(_INPUT_PREFIX)})
+
+        # Expression nodes only provide so many variables, and overly long expressions cost more to parse and
+        # evaluate than they save, so leave the subgraph as is if an output needs either
+        if len(used) > len(_EXPRESSION_VARIABLES) or sum(1 for _ in ast.walk(tree)) > _MAX_FORMULA_NODES:
+            report.skipped_subgraphs += 1
+            return
+
+        names = dict(zip(used, _EXPRESSION_VARIABLES))
+        renamed = _Substitute({name: ast.Name(id=variable, ctx=ast.Load()) for name, variable in names.items()}).visit(copy.deepcopy(tree))
+        fused[node_id] = (ast.unparse(renamed), names)
+
+    # A node with inputs that has no other node inlined into it gains nothing from being replaced by an expression
+    unchanged = {
+        node_id
+        for node_id, (_, names) in fused.items()
+        if names and all(
+            (edge["source"]["node_id"], edge["source"]["field"]) in inputs
+            for edge in edges
+            if edge["destination"]["node_id"] == node_id
+        )
+    }
+
+    if unchanged == component:
+        return
+
+    sources = {name: source for source, name in inputs.items()}
+    graph["edges"] = edges = [edge for edge in edges if edge["destination"]["node_id"] not in component - unchanged]
+
+    kept = set(unchanged)
+
+    for node_id, (expression, names) in fused.items():
+        if node_id in unchanged:
+            continue
+
+        kind = _FUSABLE_INVOCATIONS[nodes[node_id]["type"]][0]
+
+        if not names and exits[node_id]:
+            try:
+                value = _FUSED_CASTS[kind](_evaluate_expression(_compile_expression(expression), {}))
+            except (ArithmeticError, ValueError):
+                # Errors are left for the fused node to raise when the graph actually executes
+                pass
+            else:
+                # Consumers inside the component already had the constant substituted into their formulas
+                for edge in exits[node_id]:
+                    if edge["destination"]["node_id"] not in component:
+                        nodes[edge["destination"]["node_id"]][edge["destination"]["field"]] = value
+                        edges.remove(edge)
+
+                report.folded_values += 1
+                continue
+
+        nodes[node_id] = {
+            "id": node_id,
+            "type": _FUSED_INVOCATIONS[kind],
+            "is_intermediate": nodes[node_id].get("is_intermediate", False),
+            "expression": expression,
+            **{variable: 0.0 for variable in _EXPRESSION_VARIABLES},
+        }
+
+        for name, variable in names.items():
+            source_id, source_field = sources[name]
+            edges.append({
+                "source": {"node_id": source_id, "field": source_field},
+                "destination": {"node_id": node_id, "field": variable},
+            })
+
+        kept.add(node_id)
+        report.fused_nodes += 1
+
+    for node_id in component - kept:
+        del nodes[node_id]
+
+
+def _topological_order(graph: dict) -> list:
+    dependencies = {node_id: set() for node_id in graph["nodes"]}
+
+    for edge in graph["edges"]:
+        dependencies[edge["destination"]["node_id"]].add(edge["source"]["node_id"])
+
+    order = []
+    ready = [node_id for node_id, sources in dependencies.items() if not sources]
+
+    while ready:
+        node_id = ready.pop()
+        order.append(node_id)
+
+        for other, sources in dependencies.items():
+            if node_id in sources:
+                sources.discard(node_id)
+
+                if not sources:
+                    ready.append(other)
+
+    if len(order) != len(graph["nodes"]):
+        raise ValueError("Graph contains a cycle")
+
+    return order
+
+
+def _invocations() -> dict:
+    return {
+        value.__fields__["type"].default: value
+        for value in vars(essentials).values()
+        if isinstance(value, type) and issubclass(value, BaseInvocation) and value is not BaseInvocation
+    }
+
+
+def _constant_values(graph: dict, incoming: dict) -> dict:
+    """Evaluates the outputs of the fusable nodes that only depend on constants"""
+
+    nodes = graph["nodes"]
+    constants = {}
+
+    for node_id in _topological_order(graph):
+        template = _template(nodes[node_id])
+
+        if template is None:
+            continue
+
+        kind, _, fields = _FUSABLE_INVOCATIONS[nodes[node_id]["type"]]
+        replacements = {}
+
+        for field, default in fields.items():
+            edge = incoming.get((node_id, field))
+
+            if edge is None:
+                replacements[field] = ast.Constant(value=float(nodes[node_id].get(field, default)))
+            elif edge["source"]["node_id"] in constants and edge["source"]["field"] == "value":
+                value = constants[edge["source"]["node_id"]]
+                limits = _constraints(nodes[node_id]["type"]).get(field)
+
+                if limits is not None and not _satisfies(limits, value):
+                    break
+
+                replacements[field] = ast.Constant(value=float(value))
+            else:
+                break
+        else:
+            tree = _Substitute(replacements).visit(ast.parse(template, mode="eval").body)
+
+            try:
+                constants[node_id] = _FUSED_CASTS[kind](_evaluate_expression(_compile_expression(ast.unparse(tree)), {}))
+            except (ArithmeticError, ValueError):
+                pass
+
+    return constants
+
+
+def _remove_dead_nodes(graph: dict, candidates: set, report: FusionReport) -> None:
+    """Removes nodes left without consumers, along with any sources that only fed them
+
+    Only essentials nodes and intermediate nodes are removed, other nodes may be outputs of the graph.
+    """
+
+    nodes = graph["nodes"]
+    invocations = _invocations()
+    candidates = list(candidates)
+
+    while candidates:
+        node_id = candidates.pop()
+        node = nodes.get(node_id)
+
+        if node is None or any(edge["source"]["node_id"] == node_id for edge in graph["edges"]):
+            continue
+
+        if node["type"] not in invocations and not node.get("is_intermediate", False):
+            continue
+
+        candidates.extend(edge["source"]["node_id"] for edge in graph["edges"] if edge["destination"]["node_id"] == node_id)
+        graph["edges"] = [edge for edge in graph["edges"] if edge["destination"]["node_id"] != node_id]
+        del nodes[node_id]
+        report.pruned_nodes += 1
+
+
+def _prune_branch(graph: dict, incoming: dict, constants: dict, report: FusionReport) -> bool:
+    """Bypasses the first branching node whose decision is known, returning whether one was found"""
+
+    nodes = graph["nodes"]
+
+    for node_id in _topological_order(graph):
+        node = nodes[node_id]
+
+        if node["type"] not in _BRANCH_INVOCATIONS:
+            continue
+
+        kind, _, fields = _FUSABLE_INVOCATIONS[node["type"]]
+        deciding, decide = _BRANCH_INVOCATIONS[node["type"]]
+        edge = incoming.get((node_id, deciding))
+
+        if edge is None:
+            taken = decide(node.get(deciding, fields[deciding]))
+        elif edge["source"]["node_id"] in constants and edge["source"]["field"] == "value":
+            taken = decide(constants[edge["source"]["node_id"]])
+        else:
+            continue
+
+        if taken is None:
+            continue
+
+        consumers = [edge for edge in graph["edges"] if edge["source"]["node_id"] == node_id]
+
+        # Without consumers the node is an output of the graph, so it stays and only loses its untaken inputs
+        fields_removed = set(fields) if consumers else set(fields) - {deciding, taken}
+        removed = [incoming[(node_id, field)] for field in sorted(fields_removed) if (node_id, field) in incoming]
+
+        if not consumers and not removed:
+            continue
+
+        source = incoming.get((node_id, taken))
+
+        for edge in consumers:
+            if source is None:
+                nodes[edge["destination"]["node_id"]][edge["destination"]["field"]] = _FUSED_CASTS[kind](node.get(taken, fields[taken]))
+                graph["edges"].remove(edge)
+            else:
+                edge["source"] = dict(source["source"])
+
+        for edge in removed:
+            graph["edges"].remove(edge)
+
+        candidates = {edge["source"]["node_id"] for edge in removed} | ({node_id} if consumers else set())
+        _remove_dead_nodes(graph, candidates, report)
+
+        return True
+
+    return False
+
+
+def _prune_branches(graph: dict, report: FusionReport) -> None:
+    """Drops the inputs that branching nodes decided by constants never output, and the nodes only computing them"""
+
+    while True:
+        incoming = _incoming_edges(graph)
+
+        if not _prune_branch(graph, incoming, _constant_values(graph, incoming), report):
+            return
+
+
+def time_graph(graph: dict, iterations: int = 100) -> float:
+    """Measures the average seconds it takes to construct and invoke every node of a graph of essentials nodes"""
+
+    invocations = _invocations()
+
+    unknown = {node["type"] for node in graph["nodes"].values()} - invocations.keys()
+
+    if unknown:
+        raise ValueError(f"Can only time graphs made of essentials nodes, found {sorted(unknown)}")
+
+    order = _topological_order(graph)
+    incoming = {}
+
+    for edge in graph["edges"]:
+        incoming.setdefault(edge["destination"]["node_id"], []).append(edge)
+
+    start = time.perf_counter()
+
+    for _ in range(iterations):
+        outputs = {}
+
+        for node_id in order:
+            # Like in InvokeAI, a node is constructed from its own fields and then assigned the outputs of upstream nodes
+            node = invocations[graph["nodes"][node_id]["type"]](**graph["nodes"][node_id])
+
+            for edge in incoming.get(node_id, []):
+                setattr(node, edge["destination"]["field"], getattr(outputs[edge["source"]["node_id"]], edge["source"]["field"]))
+
+            outputs[node_id] = node.invoke(None)
+
+    return (time.perf_counter() - start) / iterations
+
+
+def fuse_graph(graph: dict, measure: bool = False, iterations: int = 100) -> Tuple[dict, FusionReport]:
+    """Prunes branches decided by constants and collapses subgraphs of pure nodes into expression nodes
+
+    The graph is expected in the session graph format of nodes keyed by id and a list of edges. The input graph is
+    left untouched. With measure set, both graphs are timed with time_graph, which requires that they only
+    consist of essentials nodes.
+    """
+
+    fused = copy.deepcopy(graph)
+    report = FusionReport(nodes_before=len(graph["nodes"]), nodes_after=0)
+
+    _prune_branches(fused, report)
+
+    for component in _components(fused, _fusable_nodes(fused)):
+        _fuse_component(fused, component, report)
+
+    report.nodes_after = len(fused["nodes"])
+
+    if measure:
+        report.seconds_before = time_graph(graph, iterations)
+        report.seconds_after = time_graph(fused, iterations)
+
+    return fused, report
@@ -0,0 +1,404 @@
+# Copyright (c) 2023 Andrew Lake (https://github.com/zealsprince) zealsprince.com
+
+from typing import Optional
+
+import os
+
+from ..models.image import ImageCategory, ResourceOrigin
+from .baseinvocation import BaseInvocation, InputField, InvocationContext, invocation
+
+from invokeai.app.invocations.primitives import FloatOutput, ImageField, ImageOutput
+
+from .essentials import _LazyModule, instrument
+
+# Imported on the first use of an image node, like NumPy in essentials, so loading the pack stays quick
+np = _LazyModule("numpy", "np", globals())
+Image = _LazyModule("PIL.Image", "Image", globals())
+
+# Rows processed at once by the operations that need temporaries, bounding them to a strip of the image
+_BLOCK_ROWS = 64
+
+_MODES = ("L", "RGB", "RGBA")
+
+# Seed of the random pixel samples of the statistics nodes, fixed so their outputs can be cached
+_SAMPLE_SEED = 0
+
+# Images with more pixels than this are processed in square tiles of the tile size
+_TILE_PIXELS = int(os.environ.get("INVOKEAI_ESSENTIALS_TILE_PIXELS", 4096 * 4096))
+_TILE_SIZE = 512
+
+
+def _mode(array: "np.ndarray") -> str:
+    return "L" if array.ndim == 2 else _MODES[array.shape[2] - 2]
+
+
+def _shape(image: "Image.Image") -> tuple:
+    width, height = image.size
+
+    return (height, width) if image.mode == "L" else (height, width, len(image.mode))
+
+
+def _load_image(context: InvocationContext, image: ImageField, mode: Optional[str] = None) -> "Image.Image":
+    pil_image = context.services.images.get_pil_image(image.image_name)
+
+    if mode is None and pil_image.mode not in _MODES:
+        mode = "RGBA" if "A" in pil_image.getbands() else "RGB"
+
+    if mode is not None and pil_image.mode != mode:
+        pil_image = pil_image.convert(mode)
+
+    return pil_image
+
+
+def _color_channels(array: "np.ndarray") -> "np.ndarray":
+    """Returns a view of the color channels of an image array, leaving out its alpha channel"""
+
+    return array[..., :3] if _mode(array) == "RGBA" else array
+
+
+def _apply_table(array: "np.ndarray", table: "np.ndarray") -> "np.ndarray":
+    """Maps the color channels of an image array through a 256 entry lookup table in place"""
+
+    has_alpha = _mode(array) == "RGBA"
+
+    # Take converts its indexes to intp, eight times the size of the uint8 pixels, so it only gets a strip at a time.
+    # The indexes never exceed the table, but clipping keeps take from buffering its output.
+    for start in range(0, array.shape[0], _BLOCK_ROWS):
+        block = array[start:start + _BLOCK_ROWS]
+
+        # Mapping whole contiguous strips and restoring the alpha channel is faster than mapping a strided view
+        alpha = block[..., 3].copy() if has_alpha else None
+        np.take(table, block, out=block, mode="clip")
+
+        if has_alpha:
+            block[..., 3] = alpha
+
+    return array
+
+
+def _table(values: "np.ndarray") -> "np.ndarray":
+    """Rounds and clamps the values of a lookup table computed for the inputs 0 to 255"""
+
+    return np.clip(np.rint(values), 0, 255).astype(np.uint8)
+
+
+def _inputs() -> "np.ndarray":
+    return np.arange(256, dtype=np.float64)
+
+
+def _image_output(context: InvocationContext, invocation: BaseInvocation, image) -> ImageOutput:
+    # fromarray shares the buffer of L and RGBA arrays instead of copying it
+    image_dto = context.services.images.create(
+        image=image if isinstance(image, Image.Image) else Image.fromarray(image),
+        image_origin=ResourceOrigin.INTERNAL,
+        image_category=ImageCategory.GENERAL,
+        node_id=invocation.id,
+        session_id=context.graph_execution_state_id,
+        is_intermediate=invocation.is_intermediate,
+    )
+
+    return ImageOutput(
+        image=ImageField(image_name=image_dto.image_name),
+        width=image_dto.width,
+        height=image_dto.height,
+    )
+
+
+def _apply(context: InvocationContext, invocation: BaseInvocation, images: list, operation) -> ImageOutput:
+    """Applies a per-pixel operation to the arrays of images of the same size, modifying and outputting the first
+
+    Images of more than INVOKEAI_ESSENTIALS_TILE_PIXELS pixels are processed tile by tile, so apart from the input
+    and output images only a tile of each is held in memory. The output of both paths is identical, as every output
+    pixel only depends on the input pixels at the same position.
+    """
+
+    pil_images = [_load_image(context, images[0])]
+    pil_images += [_load_image(context, image, pil_images[0].mode) for image in images[1:]]
+    sizes = {pil_image.size for pil_image in pil_images}
+
+    if len(sizes) > 1:
+        raise ValueError(f"Can not combine images of the sizes {sorted(sizes)}")
+
+    width, height = pil_images[0].size
+
+    if width * height <= _TILE_PIXELS:
+        # The array copy of the first image is the only full-size copy made, the operation works on it in place
+        return _image_output(context, invocation, operation(*(np.array(pil_image) for pil_image in pil_images)))
+
+    # InvokeAI takes the output as a PIL image, so every tile is pasted straight into it instead of into a scratch array
+    output = Image.new(pil_images[0].mode, pil_images[0].size)
+
+    for top in range(0, height, _TILE_SIZE):
+        for left in range(0, width, _TILE_SIZE):
+            box = (left, top, min(left + _TILE_SIZE, width), min(top + _TILE_SIZE, height))
+            output.paste(Image.fromarray(operation(*(np.array(pil_image.crop(box)) for pil_image in pil_images))), box)
+
+    return _image_output(context, invocation, output)
+
+
+def _add_array(array: "np.ndarray", value: int) -> "np.ndarray":
+    return _apply_table(array, _table(_inputs() + value))
+
+
+def _multiply_array(array: "np.ndarray", value: float) -> "np.ndarray":
+    return _apply_table(array, _table(_inputs() * value))
+
+
+def _clamp_array(array: "np.ndarray", low: int, high: int) -> "np.ndarray":
+    return _apply_table(array, _table(np.clip(_inputs(), low, high)))
+
+
+def _levels_array(array: "np.ndarray", in_low: int, in_high: int, gamma: float, out_low: int, out_high: int) -> "np.ndarray":
+    if in_high <= in_low:
+        raise ValueError("The input high level must be greater than the input low level")
+
+    if gamma <= 0:
+        raise ValueError("Gamma must be positive")
+
+    progress = np.clip((_inputs() - in_low) / (in_high - in_low), 0, 1) ** (1 / gamma)
+
+    return _apply_table(array, _table(out_low + progress * (out_high - out_low)))
+
+
+def _threshold_array(array: "np.ndarray", threshold: int) -> "np.ndarray":
+    return _apply_table(array, _table(np.where(_inputs() >= threshold, 255, 0)))
+
+
+def _blend_array(array: "np.ndarray", other: "np.ndarray", alpha: float) -> "np.ndarray":
+    """Blends another image array into an image array in place, strip by strip with 8 bit fixed point weights"""
+
+    weight = int(round(min(max(alpha, 0), 1) * 256))
+    channels, other_channels = _color_channels(array), _color_channels(other)
+
+    for start in range(0, array.shape[0], _BLOCK_ROWS):
+        block = channels[start:start + _BLOCK_ROWS]
+
+        # 255 * 256 + 128 still fits 16 bits, so the strip temporary only needs two bytes per channel
+        blended = block.astype(np.uint16)
+        blended *= 256 - weight
+        blended += other_channels[start:start + _BLOCK_ROWS].astype(np.uint16) * weight
+        blended += 128
+        blended >>= 8
+        block[...] = blended
+
+    return array
+
+
+@invocation("imageadd", title="Image Addition (+)", tags=["image", "math", "add", "brightness"], category="image")
+@instrument
+class ImageAddInvocation(BaseInvocation):
+    """Adds a value to the color channels of an image, clamping the results to 0-255"""
+
+    image: ImageField = InputField(description="The image to add to")
+    value: int = InputField(default=0, ge=-255, le=255, description="The value to add to every color channel")
+
+    def invoke(self, context: InvocationContext) -> ImageOutput:
+        return _apply(context, self, [self.image], lambda array: _add_array(array, self.value))
+
+
+@invocation("imagemultiply", title="Image Multiplication (*)", tags=["image", "math", "multiply", "brightness"], category="image")
+@instrument
+class ImageMultiplyInvocation(BaseInvocation):
+    """Multiplies the color channels of an image by a value, clamping the results to 0-255"""
+
+    image: ImageField = InputField(description="The image to multiply")
+    value: float = InputField(default=1, ge=0, description="The value to multiply every color channel by")
+
+    def invoke(self, context: InvocationContext) -> ImageOutput:
+        return _apply(context, self, [self.image], lambda array: _multiply_array(array, self.value))
+
+
+@invocation("imageblend", title="Image Blend", tags=["image", "math", "blend", "mix", "lerp"], category="image")
+@instrument
+class ImageBlendInvocation(BaseInvocation):
+    """Blends the color channels of two images of the same size, keeping the alpha channel of the first"""
+
+    image_a: ImageField = InputField(description="The image output at an alpha of 0")
+    image_b: ImageField = InputField(description="The image output at an alpha of 1")
+    alpha: float = InputField(default=0.5, ge=0, le=1, description="The amount of image b in the result")
+
+    def invoke(self, context: InvocationContext) -> ImageOutput:
+        return _apply(context, self, [self.image_a, self.image_b], lambda array, other: _blend_array(array, other, self.alpha))
+
+
+@invocation("imageclamp", title="Image Clamp", tags=["image", "math", "clamp", "clip"], category="image")
+@instrument
+class ImageClampInvocation(BaseInvocation):
+    """Clamps the color channels of an image between a low and high value"""
+
+    image: ImageField = InputField(description="The image to clamp")
+    low: int = InputField(default=0, ge=0, le=255, description="The lowest value of a color channel")
+    high: int = InputField(default=255, ge=0, le=255, description="The highest value of a color channel")
+
+    def invoke(self, context: InvocationContext) -> ImageOutput:
+        return _apply(context, self, [self.image], lambda array: _clamp_array(array, self.low, self.high))
+
+
+@invocation("imagelevels", title="Image Levels", tags=["image", "math", "levels", "gamma", "contrast"], category="image")
+@instrument
+class ImageLevelsInvocation(BaseInvocation):
+    """Maps the color channels of an image from an input range to an output range with a gamma correction"""
+
+    image: ImageField = InputField(description="The image to adjust")
+    in_low: int = InputField(default=0, ge=0, le=255, description="The value mapped to the output low value")
+    in_high: int = InputField(default=255, ge=0, le=255, description="The value mapped to the output high value")
+    gamma: float = InputField(default=1, gt=0, description="The gamma applied between the input values, above 1 brightens")
+    out_low: int = InputField(default=0, ge=0, le=255, description="The lowest output value")
+    out_high: int = InputField(default=255, ge=0, le=255, description="The highest output value")
+
+    def invoke(self, context: InvocationContext) -> ImageOutput:
+        return _apply(context, self, [self.image], lambda array: _levels_array(array, self.in_low, self.in_high, self.gamma, self.out_low, self.out_high))
+
+
+@invocation("imagethreshold", title="Image Threshold", tags=["image", "math", "threshold", "mask"], category="image")
+@instrument
+class ImageThresholdInvocation(BaseInvocation):
+    """Sets the color channels of an image at or above a threshold to 255 and all others to 0"""
+
+    image: ImageField = InputField(description="The image to threshold")
+    threshold: int = InputField(default=128, ge=0, le=255, description="The lowest value set to 255")
+
+    def invoke(self, context: InvocationContext) -> ImageOutput:
+        return _apply(context, self, [self.image], lambda array: _threshold_array(array, self.threshold))
+
+
+def _luminance_levels(pil_image: "Image.Image") -> "np.ndarray":
+    """Converts an image to luminance levels, flattened row by row, for the random samples of the statistics nodes"""
+
+    # Copying the bytes out of PIL is quicker than going through the array interface
+    return np.frombuffer((pil_image if pil_image.mode == "L" else pil_image.convert("L")).tobytes(), dtype=np.uint8)
+
+
+def _luminance_mean(context: InvocationContext, image: ImageField, stride: int) -> float:
+    """Computes the mean luminance of an image, or of its stride by stride block averages"""
+
+    pil_image = context.services.images.get_pil_image(image.image_name)
+    width, height = pil_image.size
+
+    if stride == 1:
+        histogram = np.array((pil_image if pil_image.mode == "L" else pil_image.convert("L")).histogram(), dtype=np.int64)
+
+        return float(np.dot(histogram, np.arange(256)) / histogram.sum())
+
+    if pil_image.mode not in _MODES:
+        pil_image = pil_image.convert("RGB")
+
+    # The box average of every block keeps the mean of its pixels, only rounding it to a whole level
+    reduced = pil_image.reduce(stride)
+    levels = np.asarray(reduced if reduced.mode == "L" else reduced.convert("L"), dtype=np.float64)
+
+    # The blocks at the right and bottom edges are cut short, so every block is weighted by its pixels
+    rows = np.minimum(stride, height - stride * np.arange(levels.shape[0]))
+    columns = np.minimum(stride, width - stride * np.arange(levels.shape[1]))
+
+    return float(rows @ levels @ columns / (width * height))
+
+
+def _luminance_histogram(context: InvocationContext, image: ImageField, stride: int) -> "np.ndarray":
+    """Counts the luminance levels of an image, or of a random sample of one in stride squared of its pixels"""
+
+    pil_image = context.services.images.get_pil_image(image.image_name)
+
+    if stride == 1:
+        # Only the 256 counts come back from PIL, never an array of the image
+        return np.array((pil_image if pil_image.mode == "L" else pil_image.convert("L")).histogram(), dtype=np.int64)
+
+    levels = _luminance_levels(pil_image)
+    samples = np.random.default_rng(_SAMPLE_SEED).integers(0, len(levels), max(1, len(levels) // stride**2))
+
+    return np.bincount(levels[samples], minlength=256)
+
+
+def _laplacian_variance(context: InvocationContext, image: ImageField, stride: int) -> float:
+    """Computes the variance of the 4-neighbour Laplacian of the luminance of an image strip by strip
+
+    With a stride above 1 the Laplacian is only computed at a random sample of one in stride squared of the
+    pixels, whose unbiased sample variance estimates the variance over all of them.
+    """
+
+    pil_image = context.services.images.get_pil_image(image.image_name)
+    width, height = pil_image.size
+
+    if stride > 1:
+        if width < 3 or height < 3:
+            return 0.0
+
+        levels = _luminance_levels(pil_image)
+        generator = np.random.default_rng(_SAMPLE_SEED)
+        count = max(2, (width - 2) * (height - 2) // stride**2)
+        centers = generator.integers(1, height - 1, count) * width + generator.integers(1, width - 1, count)
+        laplacian = sum(levels[centers + offset].astype(np.int64) for offset in (-width, width, -1, 1)) - 4 * levels[centers].astype(np.int64)
+
+        return float(np.var(laplacian, ddof=1))
+
+    total = squares = count = 0
+
+    for top in range(1, height - 1, _BLOCK_ROWS):
+        bottom = min(top + _BLOCK_ROWS, height - 1)
+        strip = pil_image.crop((0, top - 1, width, bottom + 1))
+        rows = np.asarray(strip if strip.mode == "L" else strip.convert("L"), dtype=np.int64)
+
+        laplacian = rows[:-2, 1:-1] + rows[2:, 1:-1] + rows[1:-1, :-2] + rows[1:-1, 2:] - 4 * rows[1:-1, 1:-1]
+        total += int(laplacian.sum())
+        squares += int(np.dot(laplacian.ravel(), laplacian.ravel()))
+        count += laplacian.size
+
+    return squares / count - (total / count) ** 2 if count else 0.0
+
+
+@invocation("imageluminance", title="Image Mean Luminance", tags=["image", "math", "statistics", "luminance", "brightness"], category="image")
+@instrument
+class ImageLuminanceInvocation(BaseInvocation):
+    """Calculates the mean luminance of an image from 0 to 255
+
+    With a stride of n the mean is taken over the box averages of n by n blocks, which keep the mean of the image
+    apart from rounding each block and its luminance to a whole level, so the result is within 1.5 levels of the
+    exact mean.
+    """
+
+    image: ImageField = InputField(description="The image to measure")
+    stride: int = InputField(default=1, ge=1, description="Average blocks of n by n pixels, 1 reads every pixel")
+
+    def invoke(self, context: InvocationContext) -> FloatOutput:
+        return FloatOutput(value=_luminance_mean(context, self.image, self.stride))
+
+
+@invocation("imagepercentile", title="Image Luminance Percentile", tags=["image", "math", "statistics", "luminance", "percentile", "histogram"], category="image")
+@instrument
+class ImageLuminancePercentileInvocation(BaseInvocation):
+    """Calculates a percentile of the luminance of an image from 0 to 255, e.g. 5 for the dark end of its histogram
+
+    With a stride of n the percentile is taken from a random sample of one in n squared of the pixels. By the
+    Dvoretzky-Kiefer-Wolfowitz inequality the result lies, with 95% probability, between the exact percentiles
+    p - e and p + e, where e = 100 * sqrt(ln(2 / 0.05) / (2 * samples)), e.g. 0.53 for 65536 samples.
+    """
+
+    image: ImageField = InputField(description="The image to measure")
+    percentile: float = InputField(default=50, ge=0, le=100, description="The percentage of pixels at or below the output luminance")
+    stride: int = InputField(default=1, ge=1, description="Sample one in n squared of the pixels, 1 reads all")
+
+    def invoke(self, context: InvocationContext) -> FloatOutput:
+        cumulative = np.cumsum(_luminance_histogram(context, self.image, self.stride))
+
+        # Nearest rank, the lowest level with at least the percentile of the pixels at or below it
+        rank = max(1, int(np.ceil(self.percentile / 100 * cumulative[-1])))
+
+        return FloatOutput(value=float(np.searchsorted(cumulative, rank)))
+
+
+@invocation("imagesharpness", title="Image Sharpness", tags=["image", "math", "statistics", "sharpness", "blur", "laplacian"], category="image")
+@instrument
+class ImageSharpnessInvocation(BaseInvocation):
+    """Calculates the variance of the Laplacian of the luminance of an image, which drops as an image gets blurrier
+
+    With a stride of n the variance is estimated from the Laplacian at a random sample of one in n squared of the
+    pixels. As the Laplacian lies between -1020 and 1020, Hoeffding's inequality for the sample variance bounds the
+    error, with 95% probability, by 2040^2 / 2 * sqrt(ln(2 / 0.05) / (2 * floor(samples / 2))), e.g. 15611 for
+    65536 samples. That holds for any image but is far above the errors seen on photos, see the benchmark.
+    """
+
+    image: ImageField = InputField(description="The image to measure")
+    stride: int = InputField(default=1, ge=1, description="Sample one in n squared of the pixels, 1 reads all")
+
+    def invoke(self, context: InvocationContext) -> FloatOutput:
+        return FloatOutput(value=_laplacian_variance(context, self.image, self.stride))